@@ -410,6 +410,10 @@ def page_bus():
 
 
 
+# Animation des jauges V'Lille (non bloquante)
+VLILLE_ANIM_DURATION = 0.3  # secondes
+vlille_anim = {"from": None, "to": None, "current": None, "start": 0}
+
 def page_vlille():
     vl = cache["vlille"]
     surface = pygame.Surface((LEFT_W, HEIGHT))
@@ -446,53 +450,45 @@ def page_vlille():
     val_font = pygame.font.SysFont("Arial", 90, bold=True)
     lbl_font = pygame.font.SysFont("Arial", 70)
 
-    prev_v = cache["vlille"].get("prev_pct_v", pct_v)
-    prev_p = cache["vlille"].get("prev_pct_p", pct_p)
-    steps = 10
-    for step in range(1, steps + 1):
-        frac = step / steps
-        cur_v = prev_v + (pct_v - prev_v) * frac
-        cur_p = prev_p + (pct_p - prev_p) * frac
-
-        surface.fill(DARK_RED)
-        surface.blit(title, ((LEFT_W - title.get_width()) // 2, 20))
-        surface.blit(subtitle, ((LEFT_W - subtitle.get_width()) // 2, 20 + title.get_height() + 10))
-
-        def draw_circle(cx, pct, color, value, label):
-            pygame.draw.circle(surface, GRAY, (cx, cy), radius)
-            rect = pygame.Rect(cx - radius, cy - radius, 2 * radius, 2 * radius)
-            deg2rad = 3.1416 / 180
-
-            if label == "vélos":
-                start_ang = (-90 - 360 * pct) * deg2rad
-                end_ang   = (-90) * deg2rad
-            else:
-                start_ang = (-90) * deg2rad
-                end_ang   = (-90 + 360 * pct) * deg2rad
+    # Animation des jauges : interpolation selon le temps écoulé, pilotée par la boucle principale
+    if vlille_anim["to"] != (pct_v, pct_p):
+        vlille_anim["from"] = vlille_anim["current"] or (pct_v, pct_p)
+        vlille_anim["to"] = (pct_v, pct_p)
+        vlille_anim["start"] = time.time()
+    frac = min(1.0, (time.time() - vlille_anim["start"]) / VLILLE_ANIM_DURATION)
+    prev_v, prev_p = vlille_anim["from"]
+    cur_v = prev_v + (pct_v - prev_v) * frac
+    cur_p = prev_p + (pct_p - prev_p) * frac
+    vlille_anim["current"] = (cur_v, cur_p)
+
+    def draw_circle(cx, pct, color, value, label):
+        pygame.draw.circle(surface, GRAY, (cx, cy), radius)
+        rect = pygame.Rect(cx - radius, cy - radius, 2 * radius, 2 * radius)
+        deg2rad = 3.1416 / 180
+
+        if label == "vélos":
+            start_ang = (-90 - 360 * pct) * deg2rad
+            end_ang   = (-90) * deg2rad
+        else:
+            start_ang = (-90) * deg2rad
+            end_ang   = (-90 + 360 * pct) * deg2rad
 
-            pygame.draw.arc(surface, color, rect, start_ang, end_ang, thickness)
+        pygame.draw.arc(surface, color, rect, start_ang, end_ang, thickness)
 
-            txt = val_font.render(str(value), True, BLACK)
-            lbl = lbl_font.render(label, True, BLACK)
-            surface.blit(txt, (cx - txt.get_width() // 2, cy - txt.get_height() // 2 - 10))
-            surface.blit(lbl, (cx - lbl.get_width() // 2, cy + 20))
+        txt = val_font.render(str(value), True, BLACK)
+        lbl = lbl_font.render(label, True, BLACK)
+        surface.blit(txt, (cx - txt.get_width() // 2, cy - txt.get_height() // 2 - 10))
+        surface.blit(lbl, (cx - lbl.get_width() // 2, cy + 20))
 
-        draw_circle(cx_v, cur_v, DARK_BLUE, nbv, "vélos")
-        draw_circle(cx_p, cur_p, GREEN, nbp, "places")
+    draw_circle(cx_v, cur_v, DARK_BLUE, nbv, "vélos")
+    draw_circle(cx_p, cur_p, GREEN, nbp, "places")
 
-        # Logo V'Lille
-        img = pygame.image.load("icons/vlille.png")
-        img_w = int(LEFT_W * 0.55)
-        img_h = int(img.get_height() * img_w / img.get_width())
-        img = pygame.transform.smoothscale(img, (img_w, img_h))
-        surface.blit(img, ((LEFT_W - img_w) // 2, HEIGHT - img_h - 20))
-
-        screen.blit(surface, (0, 0))
-        pygame.display.flip()
-        pygame.time.delay(30)
-
-    cache["vlille"]["prev_pct_v"] = pct_v
-    cache["vlille"]["prev_pct_p"] = pct_p
+    # Logo V'Lille
+    img = pygame.image.load("icons/vlille.png")
+    img_w = int(LEFT_W * 0.55)
+    img_h = int(img.get_height() * img_w / img.get_width())
+    img = pygame.transform.smoothscale(img, (img_w, img_h))
+    surface.blit(img, ((LEFT_W - img_w) // 2, HEIGHT - img_h - 20))
 
     screen.blit(surface, (0, 0))
 
@@ -620,50 +616,34 @@ def page_weather():
 
 # ----------------- PAGES MÉDIAS -----------------
 
+# Image média courante : chargée une seule fois, fondus calculés à chaque appel
+MEDIA_FADE_DURATION = 0.5  # secondes (fondu d'entrée et de sortie)
+media_state = {"path": None, "img": None, "start": 0, "last": 0}
+
 def page_media_image(path):
-    """Affiche une image en plein écran sur la partie gauche avec transition en fondu entrée/sortie"""
-    surf = pygame.Surface((LEFT_W, HEIGHT))
-    surf.fill(BLACK)
+    """Affiche une image en plein écran avec fondu entrée/sortie (non bloquant, appelé à chaque image)"""
+    now = time.time()
     try:
-        img = pygame.image.load(os.path.join(MEDIA_DIR, path))
-        img = pygame.transform.smoothscale(img, (LEFT_W, HEIGHT))
-        img = img.convert_alpha()
-
-        # --- Fondu d'entrée ---
-        for alpha in range(0, 256, 15):  # 15 = vitesse du fondu
-            temp = img.copy()
-            temp.set_alpha(alpha)
-            surf.fill(BLACK)
-            surf.blit(temp, (0, 0))
-            screen.blit(surf, (0, 0))
-
-            draw_right_panel()
-            pygame.display.flip()
-            pygame.time.delay(30)
-
-        # --- Maintien de l'image (durée moins temps de fondu) ---
-        start_time = time.time()
-        while time.time() - start_time < MEDIA_DURATION - 1:  # on laisse 1s pour le fondu sortie
-            surf.fill(BLACK)
-            surf.blit(img, (0, 0))
-            screen.blit(surf, (0, 0))
-            draw_right_panel()
-            pygame.display.flip()
-            pygame.time.delay(100)
-
-        # --- Fondu de sortie ---
-        for alpha in range(255, -1, -15):
-            temp = img.copy()
-            temp.set_alpha(alpha)
-            surf.fill(BLACK)
-            surf.blit(temp, (0, 0))
-            screen.blit(surf, (0, 0))
-
-            draw_right_panel()
-            pygame.display.flip()
-            pygame.time.delay(30)
+        # Nouvelle image, ou retour sur la même après un passage par d'autres pages
+        if media_state["path"] != path or now - media_state["last"] > 1:
+            img = pygame.image.load(os.path.join(MEDIA_DIR, path))
+            img = pygame.transform.smoothscale(img, (LEFT_W, HEIGHT)).convert()
+            media_state.update(path=path, img=img, start=now)
+        media_state["last"] = now
+
+        # Alpha de surface : montée, maintien puis descente avant la fin du créneau
+        elapsed = now - media_state["start"]
+        remaining = MEDIA_DURATION - elapsed
+        fade = max(0.0, min(1.0, elapsed / MEDIA_FADE_DURATION, remaining / MEDIA_FADE_DURATION))
+
+        img = media_state["img"]
+        img.set_alpha(int(255 * fade))
+        screen.fill(BLACK, (0, 0, LEFT_W, HEIGHT))
+        screen.blit(img, (0, 0))
 
     except Exception as e:
+        surf = pygame.Surface((LEFT_W, HEIGHT))
+        surf.fill(BLACK)
         err = font.render(f"Erreur : {e}", True, RED)
         surf.blit(err, (20, HEIGHT//2))
         screen.blit(surf, (0, 0))
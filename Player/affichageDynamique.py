@@ -10,11 +10,27 @@ import os
 import sys
 import time
 import json
+import queue
+import shutil
+import signal
+import itertools
+import subprocess
+import multiprocessing
 import requests
 import pygame
 import cv2
-from threading import Thread
+import numpy as np
+from threading import Thread, Condition, Lock
 from datetime import datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import media_tools
+from downloader import download_file, DownloadScheduler
+from playlist import Playlist, Timeline, plan_cycle
+from schedule import parse_date, window, ScheduleIndex, CompiledValue
+from store import ContentStore, StorageManager, STORE_DIR, INCOMING_DIR
+from services import SingleFlight, BackgroundService
+from profiler import Profiler
 
 # ==================== CONFIGURATION ====================
 
@@ -23,10 +39,20 @@ API_URL = "https://data.lillemetropole.fr/data/ogcapi/collections/ilevia:prochai
 VLILLE_URL = "https://data.lillemetropole.fr/geoserver/wfs?SERVICE=WFS&REQUEST=GetFeature&VERSION=2.0.0&TYPENAMES=dsp_ilevia%3Avlille_temps_reel&OUTPUTFORMAT=application%2Fjson"
 METEO_URL = "https://api.open-meteo.com/v1/forecast?latitude=50.6333&longitude=3.0667&daily=temperature_2m_max,temperature_2m_min,precipitation_sum,windspeed_10m_max,weather_code&current_weather=true&timezone=Europe/Paris"
 ACTUAL_URL = "https://api.open-meteo.com/v1/forecast?latitude=50.633&longitude=3.0586&models=meteofrance_seamless&current=temperature_2m,relative_humidity_2m&forecast_days=1"
+API_UPDATE_INTERVAL = 60  # Mise à jour des données API toutes les 60 secondes (thread dédié)
 
 # Serveur de contenus
 SERVER_URL = "http://192.168.1.20:8090"
 CONTENT_SYNC_INTERVAL = 60  # Synchronisation toutes les 60 secondes
+DOWNLOAD_CHUNK_SIZE = 256 * 1024  # Téléchargement en flux par blocs de 256 Ko
+DOWNLOAD_TIMEOUT = (10, 30)  # Connexion, puis délai maximal entre deux blocs reçus
+DOWNLOAD_WORKERS = 3  # Téléchargements simultanés
+DOWNLOAD_PER_HOST = 2  # Connexions simultanées maximum vers un même serveur
+
+# Espace disque du dossier downloads/
+DOWNLOADS_QUOTA_BYTES = 8 * 1024 ** 3  # Quota (fichiers, renditions et téléchargements partiels)
+STORAGE_PROTECT_HOURS = 24  # Les contenus diffusés dans les N prochaines heures ne sont jamais supprimés
+STORAGE_GC_BATCH = 20  # Suppressions maximum par passe (une passe par synchronisation)
 
 # Stations
 NOM_STATION = "SOLFERINO"
@@ -36,10 +62,43 @@ STATION_VLILLE = "PALAIS RAMEAU"
 API_PAGE_DURATION = 10  # Bus, Météo, V'lille
 MEDIA_DURATION_DEFAULT = 20  # Contenus serveur par défaut
 
+# Rotation pondérée : passages par cycle selon la priorité (champ "weight" du serveur prioritaire)
+PRIORITY_WEIGHTS = {1: 1, 2: 1, 3: 2}
+INTERRUPT_PRIORITY = 4  # À partir de cette priorité, un contenu interrompt la page en cours dès son activation
+
+# Décodage des images
+MEDIA_DECODE_WORKERS = 2  # Taille du pool de décodage (à ajuster au nombre de cœurs)
+MEDIA_DECODE_PROCESSES = False  # True : décodage dans des processus plutôt que des threads
+MEDIA_PREFETCH_AHEAD = 3  # Images à venir décodées d'avance
+
+# Transitions entre pages
+TRANSITION_KIND = "crossfade"  # "crossfade" (fondu enchaîné), "slide" (glissement) ou "cut"
+TRANSITION_DURATION = 0.6  # secondes
+
+# Cadence d'affichage (horloge de présentation unique)
+DISPLAY_VSYNC = False  # Synchronisation verticale (pygame 2, mode SCALED) ; sinon cadence par attente
+ANIMATION_FPS = 30  # Cadence pendant les transitions et animations
+PAGE_FPS = {"bus": 1, "weather": 1, "vlille": 1, "media": 1}  # Pages statiques : une image par seconde suffit
+EVENT_POLL_INTERVAL = 0.05  # Réactivité clavier pendant l'attente d'une échéance (secondes)
+
+# Profilage (touche P : activer/désactiver, touche I ou signal SIGUSR1 : rapport)
+PROFILING = False  # Actif dès le démarrage
+PROFILE_WINDOW = 1000  # Mesures conservées par minuteur (percentiles glissants)
+
+# Lecture vidéo
+VIDEO_QUEUE_SIZE = 4  # Images décodées d'avance par le thread de décodage
+VIDEO_CLOCK_SYNC = True  # Lecture temps réel : les images en retard sont sautées (grab)
+VIDEO_MAX_FPS = 30  # FPS maximal des renditions vidéo transcodées
+
 # Dossiers
 DOWNLOADS_FOLDER = "downloads"
+STORE_FOLDER = os.path.join(DOWNLOADS_FOLDER, STORE_DIR)  # Fichiers nommés par leur md5
+INCOMING_FOLDER = os.path.join(DOWNLOADS_FOLDER, INCOMING_DIR)  # Téléchargements en attente de vérification
 CACHE_FOLDER = "cache"
+TIMELINE_FILE = os.path.join(CACHE_FOLDER, "timeline.json")  # Plan de diffusion des 24 prochaines heures
 os.makedirs(DOWNLOADS_FOLDER, exist_ok=True)
+os.makedirs(STORE_FOLDER, exist_ok=True)
+os.makedirs(INCOMING_FOLDER, exist_ok=True)
 os.makedirs(CACHE_FOLDER, exist_ok=True)
 
 # Directions bus
@@ -48,10 +107,38 @@ DIRECTIONS = {
     "18": ["LOMME ANATOLE FRANCE", "VILLENEUVE D'ASCQ HOTEL DE VILLE"]
 }
 
+# ==================== PROCESSUS DE TRAVAIL ====================
+
+def start_worker_pool(workers):
+    """Pool de processus lancés tout de suite, avant pygame.init() (threads si fork indisponible)"""
+    # Un fork après l'initialisation de SDL copierait un processus multi-thread (risque
+    # d'interblocage) ; en spawn / forkserver, l'enfant réimporterait ce script et ouvrirait
+    # un second affichage. Les processus sont donc forkés maintenant, une fois pour toutes
+    if "fork" not in multiprocessing.get_all_start_methods():
+        return ThreadPoolExecutor(max_workers=workers)  # OpenCV libère le GIL pendant le décodage
+    pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("fork"))
+    # Une tâche par processus soumise d'un coup : tous les processus démarrent avant de rendre la main
+    for future in [pool.submit(time.sleep, 0.05) for _ in range(workers)]:
+        future.result()
+    return pool
+
+# Renditions d'images (un processus) et, si demandé, décodage des images à venir
+rendition_pool = start_worker_pool(1)
+decode_pool = start_worker_pool(MEDIA_DECODE_WORKERS) if MEDIA_DECODE_PROCESSES else None
+
 # ==================== INITIALISATION PYGAME ====================
 
 pygame.init()
-screen = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
+screen = None
+if DISPLAY_VSYNC:
+    try:
+        desktop = pygame.display.Info()
+        screen = pygame.display.set_mode((desktop.current_w, desktop.current_h),
+                                         pygame.FULLSCREEN | pygame.SCALED, vsync=1)
+    except (pygame.error, TypeError) as e:
+        print(f"⚠️  Synchronisation verticale indisponible ({e}), cadence par attente")
+if screen is None:
+    screen = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
 pygame.mouse.set_visible(False)
 info = pygame.display.Info()
 WIDTH, HEIGHT = info.current_w, info.current_h
@@ -62,6 +149,9 @@ RIGHT_W = WIDTH - LEFT_W
 LEFT_RECT = pygame.Rect(0, 0, LEFT_W, HEIGHT)
 RIGHT_RECT = pygame.Rect(LEFT_W, 0, RIGHT_W, HEIGHT)
 
+# Renditions pré-calculées des images (plein écran + zone gauche)
+RENDITION_SIZES = [(WIDTH, HEIGHT), (LEFT_W, HEIGHT)]
+
 # Polices
 font = pygame.font.Font(None, 60)
 small_font = pygame.font.Font(None, 50)
@@ -80,9 +170,6 @@ DARK_BLUE = (70, 130, 180)
 ORANGE = (252, 93, 51)
 PURPLE = (63, 42, 85)
 
-# Clock pour contrôle FPS
-clock = pygame.time.Clock()
-
 # ==================== CHARGEMENT ICÔNES ====================
 
 def load_and_scale(path, size):
@@ -132,16 +219,81 @@ cache = {
     "last_error": None
 }
 
+# ==================== PROFILAGE ====================
+
+profiler = Profiler(PROFILING, PROFILE_WINDOW)
+
+# Rapport à la demande depuis un terminal : kill -USR1 <pid>
+if hasattr(signal, 'SIGUSR1'):
+    signal.signal(signal.SIGUSR1, lambda signum, frame: profiler.report())
+
 # ==================== GESTIONNAIRE DE CONTENUS SERVEUR ====================
 
+def media_key(name):
+    """Clé d'un contenu serveur dans la liste de diffusion et le plan"""
+    return "media:" + name
+
+def normalize_content(content):
+    """Contenu reçu du serveur : priorité, durée et poids absents (None) ou invalides remplacés par défaut"""
+    for field, default, convert in (('priority', 2, int), ('duration', MEDIA_DURATION_DEFAULT, int),
+                                    ('weight', None, float)):
+        value = content.get(field)
+        if value is None:
+            converted = default
+        else:
+            try:
+                converted = convert(value)
+            except (TypeError, ValueError):
+                # Une valeur invalide n'interrompt pas la synchronisation des autres contenus
+                print(f"⚠️  {content.get('name')}: {field} invalide ({value!r}), valeur par défaut")
+                converted = default
+        if converted is None:
+            content.pop(field, None)
+        else:
+            content[field] = converted
+    return content
+
+def rotation_params(content):
+    """Part de diffusion d'un contenu : (poids, minimum, maximum, interruption)"""
+    priority = content['priority']
+    weight = content.get('weight', PRIORITY_WEIGHTS.get(priority, max(1, priority)))
+    interrupt = bool(content.get('interrupt')) or priority >= INTERRUPT_PRIORITY
+    return weight, content.get('min_per_cycle', 1), content.get('max_per_cycle'), interrupt
+
 class ContentManager:
     """Gestionnaire de contenus avec synchronisation serveur"""
     
-    def __init__(self):
+    def __init__(self, api_pages=()):
+        self.api_pages = list(api_pages)  # [(nom, durée)] des pages API, pour le plan de diffusion
+        self.timeline = Timeline()
+        self.rotation = {}  # clé -> place du premier passage dans le cycle de diffusion
         self.server_contents = []
+        self.manifest_version = None  # Version de la liste serveur (synchronisation différentielle)
+        # Liste de diffusion compilée, valable jusqu'à la prochaine échéance de planification
+        self.playlist = CompiledValue(self.compile_playlist)
+        self.schedule = ScheduleIndex([])
         self.last_sync = 0
-        self.sync_thread = None
+        self.sync_service = BackgroundService("synchronisation", self.sync_contents, CONTENT_SYNC_INTERVAL)
+        self.flights = SingleFlight()
         self.running = True
+        # Renditions générées hors du thread d'affichage
+        self.rendition_pool = rendition_pool  # Créé avant l'initialisation de l'affichage
+        # Renditions et transcodages demandés depuis plusieurs threads de téléchargement
+        self.media_lock = Lock()
+        self.pending_renditions = set()
+        # Transcodage des vidéos (ffmpeg en tâche de fond)
+        self.ffmpeg = shutil.which("ffmpeg")
+        self.transcode_queue = queue.PriorityQueue()  # (première diffusion prévue, ordre, chemin)
+        self.transcode_order = itertools.count()
+        self.pending_transcodes = set()
+        self.transcode_thread = None
+        self.transcode_proc = None
+        self.downloads = DownloadScheduler(
+            self.fetch_content, DOWNLOAD_WORKERS, DOWNLOAD_PER_HOST,
+            first_slot=lambda c: self.timeline.first_slot(media_key(c['name'])),
+            position=lambda c: self.rotation.get(media_key(c['name']), float('inf')))
+        self.store = ContentStore(DOWNLOADS_FOLDER, self.prepare_media, self.invalidate_playlist)
+        self.storage = StorageManager(self.store, DOWNLOADS_QUOTA_BYTES, STORAGE_PROTECT_HOURS, STORAGE_GC_BATCH)
         
     def test_server_connection(self):
         """Test de connexion au serveur"""
@@ -158,40 +310,50 @@ class ContentManager:
             return False
     
     def sync_contents(self):
+        """Synchronisation des contenus (partagée avec une synchronisation déjà en cours)"""
+        return self.flights.do("sync", self.run_sync)
+    
+    def run_sync(self):
         """Synchronisation des contenus depuis le serveur"""
         try:
             print("🔄 Synchronisation des contenus...")
             
-            response = requests.get(f"{SERVER_URL}/api/contents", timeout=10)
-            if response.status_code != 200:
-                print(f"❌ Erreur API: {response.status_code}")
+            contents = self.fetch_manifest()
+            if contents is None:
                 return False
             
-            contents = response.json()
-            print(f"📋 {len(contents)} contenus trouvés sur le serveur")
+            # Les contenus déjà présents restent jouables pendant les téléchargements
+            if contents is not self.server_contents:
+                self.schedule = ScheduleIndex(contents)
+                self.server_contents = contents
+                self.invalidate_playlist()
+            
+            # Télécharger les nouveaux contenus (en parallèle, les plus urgents d'abord)
+            # Plan des 24 prochaines heures : ordonne téléchargements et transcodages
+            self.compile_timeline()
             
-            # Télécharger les nouveaux contenus
-            downloaded = 0
+            # Contenus absents ou modifiés sur le serveur (empreinte, ETag ou date de modification)
+            jobs = []
+            now = datetime.now()
             for content in contents:
-                filename = content['name']
-                filepath = os.path.join(DOWNLOADS_FOLDER, filename)
-                
-                if not os.path.exists(filepath):
-                    try:
-                        print(f"⬇️  Téléchargement: {filename}")
-                        file_response = requests.get(content['url'], timeout=30)
-                        
-                        if file_response.status_code == 200:
-                            with open(filepath, 'wb') as f:
-                                f.write(file_response.content)
-                            downloaded += 1
-                            print(f"✅ Téléchargé: {filename}")
-                        else:
-                            print(f"❌ Erreur téléchargement {filename}: {file_response.status_code}")
-                    except Exception as e:
-                        print(f"❌ Erreur téléchargement {filename}: {e}")
+                end_date = parse_date(content.get('end_date'))
+                if end_date is not None and end_date < now:
+                    continue  # Expiré : ni téléchargé ni diffusé
+                state = self.store.status(content)
+                if state == 'ok':
+                    filepath = self.store.path_for(content['name'])
+                    if filepath:
+                        self.prepare_media(content, filepath)
+                elif state == 'adopt':
+                    # Fichier de l'ancienne arborescence : empreinte calculée puis rangé dans le stockage
+                    self.store.submit(content, os.path.join(DOWNLOADS_FOLDER, content['name']), {})
+                elif state in ('fetch', 'revalidate') and not self.storage.deferred(content, now):
+                    jobs.append((content, os.path.join(INCOMING_FOLDER, content['name'])))
+            downloaded = self.downloads.run(jobs)
+            
+            # Libère de la place si le quota est dépassé (par lots, dans ce thread)
+            self.storage.collect(contents)
             
-            self.server_contents = contents
             self.last_sync = time.time()
             
             if downloaded > 0:
@@ -205,61 +367,282 @@ class ContentManager:
             print(f"❌ Erreur synchronisation: {e}")
             return False
     
-    def get_available_contents(self):
-        """Récupère les contenus disponibles localement"""
-        available = []
+    def fetch_manifest(self):
+        """Liste des contenus serveur : seules les modifications depuis la dernière version sont transférées"""
+        headers = {}
+        if self.manifest_version is not None:
+            headers['If-None-Match'] = f'"{self.manifest_version}"'
+        params = {'since': self.manifest_version or 0}
         
-        for content in self.server_contents:
-            filepath = os.path.join(DOWNLOADS_FOLDER, content['name'])
-            if os.path.exists(filepath):
-                now = datetime.now()
-                
-                # Vérifier dates de planification
-                if content.get('start_date'):
-                    start_date = datetime.fromisoformat(content['start_date'])
-                    if now < start_date:
-                        continue
-                
-                if content.get('end_date'):
-                    end_date = datetime.fromisoformat(content['end_date'])
-                    if now > end_date:
-                        continue
+        with profiler.measure("fetch.contents"):
+            response = requests.get(f"{SERVER_URL}/api/contents", params=params, headers=headers, timeout=10)
+        if response.status_code == 304:
+            print(f"📋 Liste inchangée (version {self.manifest_version})")
+            return self.server_contents
+        if response.status_code != 200:
+            print(f"❌ Erreur API: {response.status_code}")
+            return None
+        
+        with profiler.measure("parse.contents"):
+            data = response.json()
+            # Valeurs nulles normalisées une fois pour toutes (priorité, durée, poids)
+            items = data if isinstance(data, list) else data.get('contents', []) + \
+                data.get('added', []) + data.get('changed', [])
+            for item in items:
+                normalize_content(item)
+        if isinstance(data, list):
+            # Serveur sans versions : liste complète à chaque fois
+            self.manifest_version = None
+            print(f"📋 {len(data)} contenus trouvés sur le serveur")
+            return data
+        
+        if data.get('full', True):
+            contents = data.get('contents', [])
+            print(f"📋 {len(contents)} contenus trouvés sur le serveur (version {data.get('version')})")
+        else:
+            # Différentiel appliqué à la liste locale (ordre conservé, nouveaux contenus en fin)
+            removed = set(data.get('removed', []))
+            updates = {item['name']: item for item in data.get('added', []) + data.get('changed', [])}
+            contents = []
+            for item in self.server_contents:
+                if item['name'] in removed:
+                    continue
+                contents.append(updates.pop(item['name'], item))
+            contents.extend(updates.values())
+            print(f"📋 Version {data.get('version')} : {len(data.get('added', []))} ajoutés, "
+                  f"{len(data.get('changed', []))} modifiés, {len(removed)} retirés")
+        
+        self.manifest_version = data.get('version')
+        return contents
+    
+    def fetch_content(self, content, filepath):
+        """Téléchargement d'un contenu, un seul à la fois par fichier (aucune écriture concurrente du .part)"""
+        return self.flights.do(("download", filepath), self.download_content, content, filepath)
+    
+    def download_content(self, content, filepath):
+        """Télécharge (ou revalide) un contenu puis le confie à la vérification"""
+        conditional = self.store.conditional_headers(content)
+        if not conditional:
+            print(f"⬇️  Téléchargement: {content['name']}")
+        with profiler.measure("download"):
+            validators = download_file(content['url'], filepath, conditional, content.get('md5'),
+                                       DOWNLOAD_CHUNK_SIZE, DOWNLOAD_TIMEOUT, lambda: self.running)
+        if not validators:
+            return False
+        self.store.submit(content, filepath, validators)
+        return True
+    
+    def prepare_media(self, content, filepath):
+        """Renditions (images) ou transcodage (vidéos) d'un fichier local"""
+        if content.get('type', 'image') == 'image':
+            self.schedule_renditions(filepath)
+        elif content.get('type') == 'video':
+            self.schedule_transcode(filepath, self.timeline.first_slot(media_key(content['name'])))
+    
+    def schedule_renditions(self, filepath):
+        """Lance la génération des renditions d'une image si nécessaire"""
+        with self.media_lock:
+            if filepath in self.pending_renditions:
+                return
+            # Simple stat : appelé pour chaque image à chaque synchronisation, sans relire les pixels
+            if all(media_tools.rendition_ready(filepath, size) for size in RENDITION_SIZES):
+                return
+            self.pending_renditions.add(filepath)
+        
+        try:
+            future = self.rendition_pool.submit(media_tools.make_renditions, filepath, RENDITION_SIZES)
+        except RuntimeError:
+            # Pool arrêté (fermeture en cours)
+            with self.media_lock:
+                self.pending_renditions.discard(filepath)
+            return
+        
+        def on_done(f):
+            with self.media_lock:
+                self.pending_renditions.discard(filepath)
+            try:
+                if f.result():
+                    print(f"🖼️  Renditions prêtes: {os.path.basename(filepath)}")
+            except Exception as e:
+                print(f"⚠️  Renditions impossibles pour {filepath}: {e}")
+        
+        future.add_done_callback(on_done)
+    
+    def video_rendition(self, filepath):
+        """Chemin de la rendition vidéo à jour, ou None"""
+        path = media_tools.rendition_path(filepath, (WIDTH, HEIGHT), media_tools.VIDEO_RENDITION_EXT)
+        try:
+            if os.path.getmtime(path) >= os.path.getmtime(filepath):
+                return path
+        except OSError:
+            pass
+        return None
+    
+    def schedule_transcode(self, filepath, when=float('inf')):
+        """Ajoute une vidéo à la file de transcodage (les plus tôt diffusées d'abord)"""
+        if not self.ffmpeg:
+            return
+        with self.media_lock:
+            if filepath in self.pending_transcodes or self.video_rendition(filepath):
+                return
+            self.pending_transcodes.add(filepath)
+            self.transcode_queue.put((when, next(self.transcode_order), filepath))
+            # Un seul thread, donc un seul ffmpeg à la fois, même avec plusieurs téléchargements en parallèle
+            if self.transcode_thread is None:
+                self.transcode_thread = Thread(target=self.transcode_loop, daemon=True)
+                self.transcode_thread.start()
+    
+    def transcode_loop(self):
+        """Transcode les vidéos une à une (processus ffmpeg de basse priorité)"""
+        while self.running:
+            try:
+                _, _, filepath = self.transcode_queue.get(timeout=1)
+            except queue.Empty:
+                continue
+            
+            dst = media_tools.rendition_path(filepath, (WIDTH, HEIGHT), media_tools.VIDEO_RENDITION_EXT)
+            tmp_path = dst + ".tmp"
+            try:
+                print(f"🎞️  Transcodage: {os.path.basename(filepath)}")
+                cmd = media_tools.transcode_command(filepath, tmp_path, (WIDTH, HEIGHT), VIDEO_MAX_FPS, self.ffmpeg)
+                if shutil.which("nice"):
+                    cmd = ["nice", "-n", "10"] + cmd
+                self.transcode_proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+                _, err = self.transcode_proc.communicate()
                 
-                available.append({
-                    'filepath': filepath,
-                    'duration': content.get('duration', MEDIA_DURATION_DEFAULT),
-                    'type': content.get('type', 'image'),
-                    'priority': content.get('priority', 2),
-                    'name': content['name']
-                })
+                if self.transcode_proc.returncode == 0 and self.running:
+                    os.replace(tmp_path, dst)
+                    self.invalidate_playlist()
+                    print(f"✅ Rendition vidéo prête: {os.path.basename(dst)}")
+                else:
+                    print(f"❌ Erreur transcodage {filepath}: {err.decode(errors='replace').strip()[-200:]}")
+            except Exception as e:
+                print(f"❌ Erreur transcodage {filepath}: {e}")
+            finally:
+                self.transcode_proc = None
+                with self.media_lock:
+                    self.pending_transcodes.discard(filepath)
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+    
+    def compile_timeline(self):
+        """Recompile le plan de diffusion des 24 prochaines heures (segments modifiés uniquement)"""
+        items = [{'key': name, 'name': name, 'type': None, 'duration': duration,
+                  'weight': 1, 'min': 1, 'max': None, 'start': None, 'end': None}
+                 for name, duration in self.api_pages]
+        for content in self.server_contents:
+            weight, low, high, _ = rotation_params(content)
+            start, end = window(content)
+            items.append({'key': media_key(content['name']), 'name': content['name'],
+                          'type': content.get('type', 'image'),
+                          'duration': content['duration'],
+                          'weight': weight, 'min': low, 'max': high, 'start': start, 'end': end})
+        
+        # Cycle de diffusion si tous les contenus étaient actifs : même ordre d'entrée que sync_playlist()
+        # (pages API puis contenus par priorité), départage des téléchargements hors horizon
+        media = sorted(zip(self.server_contents, items[len(self.api_pages):]),
+                       key=lambda pair: pair[0]['priority'], reverse=True)
+        ordered = items[:len(self.api_pages)] + [item for _, item in media]
+        self.rotation = {}
+        for index, (key, _) in enumerate(plan_cycle(
+                [(item['key'], item['weight'], item['min'], item['max']) for item in ordered])):
+            self.rotation.setdefault(key, index)
+        
+        if self.timeline.compile(items, time.time()):
+            self.timeline.export(TIMELINE_FILE)
+            print(f"🗓️  Plan 24 h: {len(self.timeline.slots)} créneaux "
+                  f"({self.timeline.recompiled}/{len(self.timeline.segments)} segments recalculés)")
+    
+    def invalidate_playlist(self):
+        """Force la recompilation de la liste de diffusion (manifeste ou fichier local modifié)"""
+        self.playlist.invalidate()
+    
+    def compile_playlist(self, now):
+        """Contenus diffusables à un instant, et instant du prochain début ou fin de diffusion"""
+        schedule = self.schedule
+        activated, deactivated = schedule.advance(now)
+        for content in activated:
+            print(f"▶️  Début de diffusion: {content['name']}")
+        for content in deactivated:
+            print(f"⏹️  Fin de diffusion: {content['name']}")
+        
+        available = []
+        for content in schedule.active_at(now):
+            filepath = self.store.path_for(content['name'])
+            if not filepath:
+                continue
+            
+            # Vidéos : rendition transcodée à la taille écran si disponible
+            if content.get('type') == 'video':
+                filepath = self.video_rendition(filepath) or filepath
+            
+            # Part de diffusion : passages par cycle, bornés par min/max
+            weight, low, high, interrupt = rotation_params(content)
+            available.append({
+                'filepath': filepath,
+                'duration': content['duration'],
+                'type': content.get('type', 'image'),
+                'priority': content['priority'],
+                'name': content['name'],
+                'weight': weight,
+                'min_per_cycle': low,
+                'max_per_cycle': high,
+                'interrupt': interrupt
+            })
         
         # Trier par priorité (plus haute en premier)
         available.sort(key=lambda x: x['priority'], reverse=True)
-        return available
+        return available, schedule.next_change(now)
+    
+    def next_boundary(self):
+        """Prochain début ou fin de diffusion (timestamp, inf si aucun)"""
+        return self.schedule.next_change(time.time())
     
-    def start_sync_thread(self):
+    def get_available_contents(self):
+        """Récupère les contenus disponibles localement (liste recompilée seulement si nécessaire)"""
+        return self.playlist.get(time.time())
+    
+    def mark_played(self, filepath):
+        """Note la diffusion d'un contenu (ordre d'éviction du quota disque)"""
+        self.storage.mark_played(filepath)
+    
+    def start_sync_thread(self, immediate=True):
         """Démarre le thread de synchronisation automatique"""
-        def sync_loop():
-            while self.running:
-                self.sync_contents()
-                time.sleep(CONTENT_SYNC_INTERVAL)
-        
-        self.sync_thread = Thread(target=sync_loop, daemon=True)
-        self.sync_thread.start()
+        self.sync_service.start(immediate)
         print(f"🔄 Synchronisation automatique démarrée (toutes les {CONTENT_SYNC_INTERVAL}s)")
     
+    def request_sync(self):
+        """Synchronisation immédiate dans le thread dédié (ignorée si déjà en cours)"""
+        return self.sync_service.request()
+    
+    def sync_status(self):
+        """Libellé de la synchronisation en cours pour l'indicateur à l'écran, ou None"""
+        if not self.sync_service.active():
+            return None
+        done, total = self.downloads.progress
+        if self.sync_service.busy and done < total:
+            return f"Synchronisation {done}/{total}"
+        return "Synchronisation"
+    
     def stop(self):
         """Arrête le gestionnaire de contenus"""
         self.running = False
+        self.sync_service.stop()
+        self.store.running = False
+        self.rendition_pool.shutdown(wait=False)
+        if self.transcode_proc:
+            self.transcode_proc.terminate()
 
 # ==================== FONCTIONS RÉCUPÉRATION API ====================
 
 def fetch_actual():
     """Récupère la météo actuelle"""
     try:
-        r = requests.get(ACTUAL_URL, timeout=5)
-        r.raise_for_status()
-        d = r.json()
+        with profiler.measure("fetch.actual"):
+            r = requests.get(ACTUAL_URL, timeout=5)
+            r.raise_for_status()
+        with profiler.measure("parse.actual"):
+            d = r.json()
         current = d.get("current", {})
         cache["actual"]["temperature"] = current.get("temperature_2m", cache["actual"].get("temperature"))
         cache["actual"]["humidity"] = current.get("relative_humidity_2m", cache["actual"].get("humidity"))
@@ -271,9 +654,11 @@ def fetch_actual():
 def fetch_forecast():
     """Récupère les prévisions météo"""
     try:
-        r = requests.get(METEO_URL, timeout=10)
-        r.raise_for_status()
-        cache["forecast"] = r.json()["daily"]
+        with profiler.measure("fetch.forecast"):
+            r = requests.get(METEO_URL, timeout=10)
+            r.raise_for_status()
+        with profiler.measure("parse.forecast"):
+            cache["forecast"] = r.json()["daily"]
         cache["last_error"] = None
     except Exception as e:
         cache["last_error"] = f"Météo: {e}"
@@ -282,9 +667,12 @@ def fetch_forecast():
 def fetch_vlille():
     """Récupère les données V'lille"""
     try:
-        r = requests.get(VLILLE_URL, timeout=10)
-        r.raise_for_status()
-        for f in r.json().get("features", []):
+        with profiler.measure("fetch.vlille"):
+            r = requests.get(VLILLE_URL, timeout=10)
+            r.raise_for_status()
+        with profiler.measure("parse.vlille"):
+            features = r.json().get("features", [])
+        for f in features:
             p = f["properties"]
             if p.get("nom") == STATION_VLILLE:
                 cache["vlille"] = {
@@ -300,9 +688,11 @@ def fetch_vlille():
 def fetch_bus_next():
     """Récupère les prochains bus"""
     try:
-        r = requests.get(API_URL, timeout=10)
-        r.raise_for_status()
-        recs = r.json().get("records", [])
+        with profiler.measure("fetch.bus"):
+            r = requests.get(API_URL, timeout=10)
+            r.raise_for_status()
+        with profiler.measure("parse.bus"):
+            recs = r.json().get("records", [])
         if recs:
             cache["bus_records"] = recs
         
@@ -326,14 +716,206 @@ def fetch_bus_next():
         cache["last_error"] = f"Bus: {e}"
     return cache["bus_next"]
 
+api_flights = SingleFlight()
+
 def update_all_api_data():
-    """Met à jour toutes les données API"""
+    """Met à jour toutes les données API (partagée avec une mise à jour déjà en cours)"""
+    return api_flights.do("api", refresh_api_data)
+
+def refresh_api_data():
+    """Interroge les quatre API et met à jour le cache"""
     fetch_actual()
     fetch_vlille()
     fetch_bus_next()
     fetch_forecast()
     cache["last_update"] = datetime.now()
 
+api_service = BackgroundService("mise à jour API", update_all_api_data, API_UPDATE_INTERVAL)
+
+# ==================== PRÉSENTATION ====================
+
+class Presenter:
+    """Horloge de présentation unique : échéances d'images, cadence par page, statistiques"""
+    
+    def __init__(self):
+        self.last_deadline = None
+        self.animating = False
+        # Statistiques depuis le dernier relevé, puis depuis le démarrage
+        self.frames = self.missed = 0
+        self.worst = 0.0
+        self.total_frames = self.total_missed = 0
+    
+    @staticmethod
+    def now():
+        """Horloge monotone commune au rendu, aux animations et à la vidéo"""
+        return time.monotonic()
+    
+    def animate(self):
+        """Demande la cadence d'animation pour la prochaine image"""
+        self.animating = True
+    
+    def wait_until(self, deadline):
+        """Attend une échéance ; retourne False plus tôt si une touche ou la fermeture arrive"""
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return True
+            if pygame.event.peek((pygame.KEYDOWN, pygame.QUIT)):
+                return False
+            time.sleep(min(remaining, EVENT_POLL_INTERVAL))
+    
+    def present(self, deadline=None, interval=None):
+        """Affiche l'image composée ; compte une échéance manquée au-delà d'une demi-image de retard"""
+        with profiler.measure("flip"):
+            pygame.display.flip()
+        self.frames += 1
+        self.total_frames += 1
+        if deadline is not None and interval:
+            lateness = time.monotonic() - deadline
+            if lateness > interval / 2:
+                self.missed += 1
+                self.total_missed += 1
+                self.worst = max(self.worst, lateness)
+    
+    def wait_frame(self, fps, limit=None):
+        """Attend l'échéance de la prochaine image (au plus tard limit), à composer puis afficher par present()
+        
+        Attendre avant le rendu : l'image affichée (horloge, comptes à rebours) est à jour à l'échéance.
+        Retourne (échéance, intervalle) pour present()
+        """
+        if self.animating:
+            fps = max(fps, ANIMATION_FPS)
+        self.animating = False
+        interval = 1.0 / fps
+        now = time.monotonic()
+        
+        deadline = now if self.last_deadline is None else self.last_deadline + interval
+        if limit is not None:
+            deadline = min(deadline, limit)
+        if now - deadline > interval:
+            deadline = now  # Plus d'une image de retard : recalage plutôt que rattrapage en rafale
+        if not self.wait_until(deadline):
+            deadline = time.monotonic()  # Événement clavier : image avancée
+        self.last_deadline = deadline
+        return deadline, interval
+    
+    def take_stats(self):
+        """(images, échéances manquées, pire retard en s) depuis le dernier relevé"""
+        stats = (self.frames, self.missed, self.worst)
+        self.frames = self.missed = 0
+        self.worst = 0.0
+        return stats
+
+presenter = Presenter()
+
+# ==================== ANIMATIONS ET TRANSITIONS ====================
+
+def ease_in_out(t):
+    """Courbe d'accélération douce (t entre 0 et 1)"""
+    return t * t * (3 - 2 * t)
+
+class Tween:
+    """Interpolation temporelle d'une valeur, évaluée à chaque image par la boucle principale"""
+    
+    def __init__(self, start, end, duration, now=None, easing=ease_in_out):
+        self.start = start
+        self.end = end
+        self.duration = duration
+        self.start_time = presenter.now() if now is None else now
+        self.easing = easing
+    
+    def progress(self, now=None):
+        """Avancement entre 0 et 1"""
+        if self.duration <= 0:
+            return 1.0
+        now = presenter.now() if now is None else now
+        return min(1.0, max(0.0, (now - self.start_time) / self.duration))
+    
+    def value(self, now=None):
+        """Valeur interpolée à l'instant now"""
+        return self.start + (self.end - self.start) * self.easing(self.progress(now))
+    
+    def done(self, now=None):
+        """Vrai une fois l'animation terminée"""
+        return self.progress(now) >= 1.0
+
+class AnimatedValue:
+    """Valeur affichée qui glisse vers sa nouvelle cible au lieu de sauter"""
+    
+    def __init__(self, duration):
+        self.duration = duration
+        self.tween = None
+    
+    def get(self, target, now=None):
+        """Valeur à afficher pour la cible courante"""
+        if self.tween is None:
+            self.tween = Tween(target, target, 0, now)
+        elif self.tween.end != target:
+            self.tween = Tween(self.tween.value(now), target, self.duration, now)
+        if not self.tween.done(now):
+            presenter.animate()
+        return self.tween.value(now)
+
+class Transition:
+    """Transition non bloquante entre la dernière image affichée et la nouvelle page"""
+    
+    def __init__(self, kind=TRANSITION_KIND, duration=TRANSITION_DURATION):
+        self.kind = kind
+        self.duration = duration
+        # Image de la page sortante, allouée une seule fois
+        self.previous = pygame.Surface((WIDTH, HEIGHT)).convert()
+        self.tween = None
+    
+    def start(self, source):
+        """Mémorise l'image sortante et démarre la transition"""
+        if self.kind == "cut" or self.duration <= 0:
+            self.tween = None
+            return
+        self.previous.blit(source, (0, 0))
+        self.tween = Tween(0.0, 1.0, self.duration)
+    
+    def apply(self, target, now=None):
+        """Compose la transition sur la nouvelle page déjà dessinée dans target"""
+        if self.tween is None:
+            return False
+        if self.tween.done(now):
+            self.tween = None
+            return False
+        
+        presenter.animate()
+        t = self.tween.value(now)
+        if self.kind == "slide":
+            # La nouvelle page entre par la droite en poussant l'ancienne
+            offset = int(WIDTH * t)
+            target.scroll(WIDTH - offset, 0)
+            target.blit(self.previous, (-offset, 0))
+        else:
+            # Fondu enchaîné : alpha de surface, sans copie par étape
+            self.previous.set_alpha(int(255 * (1 - t)))
+            target.blit(self.previous, (0, 0))
+        return True
+
+class StatusBadge:
+    """Indicateur discret (coin inférieur gauche) des tâches de fond en cours"""
+    
+    def __init__(self):
+        self.label = None
+        self.surface = None
+    
+    def draw(self, target, label):
+        """Dessine le libellé (rendu seulement quand il change) ; rien si label est None"""
+        if label is None:
+            return
+        if label != self.label:
+            text = small_font.render(label, True, WHITE)
+            self.surface = pygame.Surface((text.get_width() + 30, text.get_height() + 16), pygame.SRCALPHA)
+            self.surface.fill((0, 0, 0, 160))
+            self.surface.blit(text, (15, 8))
+            self.label = label
+        target.blit(self.surface, (20, HEIGHT - self.surface.get_height() - 20))
+
+status_badge = StatusBadge()
+
 # ==================== PANNEAU DROIT (INFO TEMPS RÉEL) ====================
 
 def draw_right_panel():
@@ -695,6 +1277,9 @@ def page_weather():
     screen.blit(surface, (0, 0))
     draw_right_panel()
 
+# Jauges V'lille animées d'une valeur à la suivante
+vlille_gauges = {"vélos": AnimatedValue(0.5), "places": AnimatedValue(0.5)}
+
 def page_vlille():
     """Page V'lille (partie gauche + panneau droit)"""
     vl = cache["vlille"]
@@ -732,6 +1317,7 @@ def page_vlille():
     lbl_font = pygame.font.SysFont("Arial", 70)
 
     def draw_circle(cx, pct, color, value, label):
+        pct = vlille_gauges[label].get(pct)
         pygame.draw.circle(surface, GRAY, (cx, cy), radius)
         rect = pygame.Rect(cx - radius, cy - radius, 2 * radius, 2 * radius)
         deg2rad = 3.1416 / 180
@@ -765,84 +1351,436 @@ def page_vlille():
 
 # ==================== AFFICHAGE CONTENUS SERVEUR ====================
 
+def load_media_image(filepath, size):
+    """Charge une image média à la taille voulue (rendition brute si disponible)"""
+    data = media_tools.load_rendition(filepath, size)
+    if data is not None:
+        return pygame.image.frombuffer(data, size, 'RGB')
+    
+    try:
+        # Décodage réduit (JPEG) puis mise à l'échelle depuis une taille proche
+        rgb = cv2.cvtColor(media_tools.decode_scaled(filepath, size), cv2.COLOR_BGR2RGB)
+        return pygame.image.frombuffer(rgb.tobytes(), size, 'RGB')
+    except Exception:
+        # Formats non gérés par OpenCV (GIF...)
+        image = pygame.image.load(filepath)
+        return pygame.transform.smoothscale(image, size)
+
+class ImageLoader:
+    """Pool de décodage des images à venir, priorisé par position dans la rotation"""
+    
+    def __init__(self, workers=MEDIA_DECODE_WORKERS, process_pool=None):
+        self.workers = workers
+        # Pool de processus (créé avant l'initialisation de l'affichage), ou décodage dans les threads
+        self.process_pool = process_pool
+        self.threads = []
+        self.tasks = queue.PriorityQueue()
+        self.ready = Condition()
+        self.seq = 0
+        self.wanted = set()
+        self.pending = set()
+        self.results = {}   # (chemin, taille) -> octets RGB ou exception
+        self.surfaces = {}  # (chemin, taille) -> Surface prête à afficher
+        self.running = True
+    
+    def start(self):
+        """Démarre les threads de décodage (au premier besoin)"""
+        # Avec un pool de processus, les threads ne font que répartir le travail
+        for _ in range(self.workers):
+            thread = Thread(target=self.worker, daemon=True)
+            thread.start()
+            self.threads.append(thread)
+    
+    def worker(self):
+        """Décode les images demandées par ordre de priorité"""
+        while self.running:
+            try:
+                _, _, key = self.tasks.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            
+            with self.ready:
+                if key not in self.wanted:
+                    # Plus prévu dans la rotation entre-temps
+                    self.pending.discard(key)
+                    continue
+            
+            try:
+                if self.process_pool is not None:
+                    data = self.process_pool.submit(media_tools.decode_rgb, *key).result()
+                else:
+                    data = media_tools.decode_rgb(*key)
+            except Exception as e:
+                data = e
+            
+            with self.ready:
+                self.pending.discard(key)
+                self.results[key] = data
+                self.ready.notify_all()
+    
+    def request(self, key, priority):
+        """Place une image dans la file de décodage (0 = la plus urgente)"""
+        if not self.threads:
+            self.start()
+        with self.ready:
+            self.wanted.add(key)
+            if key in self.surfaces or key in self.results or key in self.pending:
+                return
+            self.pending.add(key)
+            self.seq += 1
+            self.tasks.put((priority, self.seq, key))
+    
+    def prefetch(self, filepaths, size):
+        """Décode d'avance les images à venir (dans l'ordre de passage) et oublie les autres"""
+        keys = [(filepath, tuple(size)) for filepath in filepaths]
+        with self.ready:
+            self.wanted = set(keys)
+            for key in list(self.surfaces):
+                if key not in self.wanted:
+                    del self.surfaces[key]
+            for key in list(self.results):
+                if key not in self.wanted:
+                    del self.results[key]
+        for position, key in enumerate(keys):
+            self.request(key, position + 1)
+    
+    def get(self, filepath, size):
+        """Surface prête à afficher (attend le décodage si l'image n'a pas été anticipée)"""
+        key = (filepath, tuple(size))
+        surf = self.surfaces.get(key)
+        if surf is not None:
+            return surf
+        
+        self.request(key, 0)
+        with self.ready:
+            while key not in self.results and self.running:
+                self.ready.wait(0.1)
+            data = self.results.pop(key, None)
+        
+        if isinstance(data, bytes):
+            surf = pygame.image.frombuffer(data, key[1], 'RGB').convert()
+        else:
+            # Format non géré par OpenCV (GIF...) : chargement pygame classique
+            surf = load_media_image(filepath, key[1])
+        self.surfaces[key] = surf
+        return surf
+    
+    def stop(self):
+        """Arrête le pool de décodage"""
+        self.running = False
+        if self.process_pool is not None:
+            self.process_pool.shutdown(wait=False)
+
+image_loader = ImageLoader(process_pool=decode_pool)
+
 def display_image_fullscreen(filepath):
     """Affiche une image en plein écran"""
     try:
-        image = pygame.image.load(filepath)
-        image = pygame.transform.scale(image, (WIDTH, HEIGHT))
-        screen.blit(image, (0, 0))
-        pygame.display.flip()
+        image = image_loader.get(filepath, (WIDTH, HEIGHT))
+        with profiler.measure("blit"):
+            screen.blit(image, (0, 0))
         return True
     except Exception as e:
         print(f"❌ Erreur affichage image {filepath}: {e}")
         return False
 
-def display_video_fullscreen(filepath, duration):
-    """Affiche une vidéo en plein écran avec décodage optimisé"""
-    try:
-        cap = cv2.VideoCapture(filepath, cv2.CAP_FFMPEG)
-        if not cap.isOpened():
-            print(f"❌ Impossible d'ouvrir la vidéo: {filepath}")
-            return False
-
-        cap.set(cv2.CAP_PROP_BUFFERSIZE, 3)
+# Les tampons BGR d'OpenCV sont utilisés tels quels si pygame les accepte (>= 2.1.3)
+try:
+    pygame.image.frombuffer(bytes(3), (1, 1), 'BGR')
+    FRAME_FORMAT = 'BGR'
+except ValueError:
+    FRAME_FORMAT = 'RGB'
+
+def make_frame_slot(size):
+    """Crée un tampon d'image et la Surface qui partage sa mémoire"""
+    w, h = size
+    buf = np.empty((h, w, 3), dtype=np.uint8)
+    return buf, pygame.image.frombuffer(buf, size, FRAME_FORMAT)
+
+def open_video(filepath):
+    """Ouvre une vidéo et démultiplexe sa première image (pré-roll), None si illisible"""
+    cap = cv2.VideoCapture(filepath, cv2.CAP_FFMPEG)
+    if not cap.isOpened() or not cap.grab():
+        cap.release()
+        return None
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, 3)
+    return cap
 
-        fps = cap.get(cv2.CAP_PROP_FPS)
-        if not fps or fps <= 0 or fps > 1000:
-            fps = 30.0
+class VideoDecoder(Thread):
+    """Thread de décodage vidéo alimentant un anneau borné d'images prêtes à afficher"""
+    
+    def __init__(self, filepath, duration):
+        super().__init__(daemon=True)
+        self.filepath = filepath
+        self.duration = duration
+        self.cap = None
+        self.reader = None
+        self.frame_duration = 1.0 / 30
+        self.frames = queue.Queue(maxsize=VIDEO_QUEUE_SIZE)
+        # Anneau de tampons réutilisés : un en cours de décodage + ceux de la file
+        self.free_slots = queue.Queue()
+        for _ in range(VIDEO_QUEUE_SIZE + 1):
+            self.free_slots.put(make_frame_slot((WIDTH, HEIGHT)))
+        # Seconde ouverture du même clip, prête pour un bouclage sans recherche
+        self.loop_cap = None
+        self.loop_thread = None
+        self.running = True
+        self.decoded = 0
+        self.skipped = 0
+        # Horloge vidéo (fixée par le rendu à la première image affichée)
+        self.start_time = None
+    
+    def is_late(self, index):
+        """Vrai si l'image index sera déjà dépassée par l'horloge vidéo"""
+        if not VIDEO_CLOCK_SYNC or self.start_time is None:
+            return False
+        return presenter.now() - self.start_time > (index + 1) * self.frame_duration
+    
+    def put(self, item):
+        """Dépose un élément dans la file sans bloquer l'arrêt du thread"""
+        while self.running:
+            try:
+                self.frames.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+    
+    def take_slot(self):
+        """Attend un tampon libre (None si arrêt demandé)"""
+        while self.running:
+            try:
+                return self.free_slots.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return None
+    
+    def release(self, slot):
+        """Rend un tampon à l'anneau une fois son image affichée ou abandonnée"""
+        self.free_slots.put(slot)
+    
+    def use_capture(self, cap):
+        """Branche le lecteur sur une capture déjà pré-rollée"""
+        self.cap = cap
+        self.reader = media_tools.FrameReader(cap, (WIDTH, HEIGHT), rgb=FRAME_FORMAT == 'RGB',
+                                              pregrabbed=True)
+    
+    def prepare_loop(self):
+        """Ouvre en tâche de fond la capture qui prendra le relais en fin de clip"""
+        def open_next():
+            cap = open_video(self.filepath)
+            if cap is not None and not self.running:
+                cap.release()
+                return
+            self.loop_cap = cap
+        
+        self.loop_thread = Thread(target=open_next, daemon=True)
+        self.loop_thread.start()
+    
+    def restart_clip(self):
+        """Fin du clip : bascule sur la seconde capture (ou recherche en dernier recours)"""
+        if self.loop_thread is not None:
+            self.loop_thread.join()
+            self.loop_thread = None
+        
+        if self.loop_cap is not None:
+            self.cap.release()
+            self.use_capture(self.loop_cap)
+            self.loop_cap = None
+            self.prepare_loop()
+        else:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+    
+    def run(self):
+        index = 0
+        looped = False
+        slot = None
+        try:
+            cap = open_video(self.filepath)
+            if cap is None:
+                print(f"❌ Impossible d'ouvrir la vidéo: {self.filepath}")
+                return
+            self.use_capture(cap)
+            
+            fps = cap.get(cv2.CAP_PROP_FPS)
+            if not fps or fps <= 0 or fps > 1000:
+                fps = 30.0
+            self.frame_duration = 1.0 / fps
+            
+            # Bouclage prévisible : la seconde capture est préparée dès maintenant
+            frame_count = cap.get(cv2.CAP_PROP_FRAME_COUNT)
+            if self.duration <= 0 or frame_count <= 0 or self.duration > frame_count / fps:
+                self.prepare_loop()
+            
+            while self.running:
+                if slot is None:
+                    slot = self.take_slot()
+                    if slot is None:
+                        break
+                
+                if not self.reader.grab():
+                    if self.decoded == 0 or looped:
+                        break  # Vidéo illisible
+                    # Fin du clip : reprise au début, l'horloge vidéo continue
+                    self.restart_clip()
+                    looped = True
+                    continue
+                looped = False
+                
+                if self.is_late(index):
+                    # Rattrapage : image démultiplexée mais jamais convertie
+                    self.skipped += 1
+                    index += 1
+                    continue
+                
+                if not self.reader.retrieve_into(slot[0]):
+                    index += 1
+                    continue
+                self.decoded += 1
+                
+                if not self.put((index * self.frame_duration, slot)):
+                    break
+                slot = None
+                index += 1
+        except Exception as e:
+            print(f"❌ Erreur décodage vidéo: {e}")
+        finally:
+            if self.cap is not None:
+                self.cap.release()
+            if self.loop_thread is not None:
+                self.loop_thread.join()
+            if self.loop_cap is not None:
+                self.loop_cap.release()
+            self.put(None)  # Fin de flux
+    
+    def stop(self):
+        """Arrête le décodage et libère la vidéo"""
+        self.running = False
+        self.join(timeout=1)
 
-        print(f"🎬 Lecture vidéo à {fps} FPS - Mode haute performance")
+class VideoPreloader:
+    """Garde le prochain clip ouvert avec ses premières images déjà décodées"""
+    
+    def __init__(self):
+        self.decoder = None
+    
+    def preroll(self, filepath, duration):
+        """Ouvre et pré-décode un clip avant le début de son créneau"""
+        if self.decoder is not None:
+            if self.decoder.filepath == filepath:
+                return
+            self.discard()
+        
+        # Sans horloge démarrée, le thread se met en attente une fois l'anneau rempli
+        self.decoder = VideoDecoder(filepath, duration)
+        self.decoder.start()
+    
+    def take(self, filepath, duration):
+        """Retourne le décodeur pré-rollé du clip (ou en démarre un nouveau)"""
+        decoder = self.decoder
+        self.decoder = None
+        if decoder is not None and decoder.filepath == filepath:
+            decoder.duration = duration
+            return decoder
+        if decoder is not None:
+            decoder.stop()
+        
+        decoder = VideoDecoder(filepath, duration)
+        decoder.start()
+        return decoder
+    
+    def discard(self):
+        """Libère le clip pré-rollé"""
+        if self.decoder is not None:
+            self.decoder.stop()
+            self.decoder = None
+
+video_preloader = VideoPreloader()
+
+def display_video_fullscreen(filepath, duration, transition=None, hotkeys=None, overlay=None, interrupted=None):
+    """Affiche une vidéo en plein écran (décodage dans un thread dédié)"""
+    # hotkeys : {touche: fonction} traitées sans interrompre la vidéo ; overlay(surface) dessiné sur chaque image ;
+    # interrupted() vérifié à chaque image : True arrête la vidéo (contenu urgent)
+    try:
+        decoder = video_preloader.take(filepath, duration)
+    except Exception as e:
+        print(f"❌ Erreur affichage vidéo {filepath}: {e}")
+        return False
 
-        total_duration_ms = int(duration * 1000)
-        start_time = time.time()
-        frame_duration = 1.0 / fps
-        frame_count = 0
+    start_time = None
+    dropped = 0
+    result = True
+    presenter.take_stats()
 
+    try:
         while True:
-            elapsed = (time.time() - start_time) * 1000
-            if total_duration_ms > 0 and elapsed >= total_duration_ms:
+            if start_time is not None and duration > 0 and presenter.now() - start_time >= duration:
                 break
 
-            ret, frame = cap.read()
-            if not ret:
-                cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
-                frame_count = 0
-                start_time = time.time()
-                continue
-
-            frame = cv2.resize(frame, (WIDTH, HEIGHT), interpolation=cv2.INTER_NEAREST)
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            surf = pygame.surfarray.make_surface(frame_rgb.swapaxes(0, 1))
-
-            screen.blit(surf, (0, 0))
-            pygame.display.flip()
-
-            for event in pygame.event.get():
+            stop = False
+            with profiler.measure("event"):
+                events = pygame.event.get()
+            for event in events:
                 if event.type == pygame.QUIT:
-                    cap.release()
-                    return False
+                    stop = True
                 if event.type == pygame.KEYDOWN:
                     if event.key in (pygame.K_ESCAPE, pygame.K_q):
-                        cap.release()
-                        return False
+                        stop = True
+                    elif hotkeys and event.key in hotkeys:
+                        hotkeys[event.key]()
+            if stop:
+                result = False
+                break
+            if interrupted is not None and interrupted():
+                break
+
+            frame_duration = decoder.frame_duration
+            try:
+                item = decoder.frames.get(timeout=frame_duration)
+            except queue.Empty:
+                continue  # Décodage en retard : l'image précédente reste affichée
+            if item is None:
+                result = decoder.decoded > 0
+                break
 
-            frame_count += 1
-            target_time = start_time + (frame_count * frame_duration)
-            sleep_time = target_time - time.time()
+            pts, slot = item
+            if start_time is None:
+                # L'horloge vidéo démarre à la première image prête
+                print(f"🎬 Lecture vidéo à {1.0 / frame_duration:.1f} FPS - Mode haute performance")
+                start_time = presenter.now() - pts
+                decoder.start_time = start_time
+
+            now = presenter.now() - start_time
+            if VIDEO_CLOCK_SYNC and now > pts + frame_duration and not decoder.frames.empty():
+                # Image périmée et une suivante est déjà prête : on l'abandonne
+                decoder.release(slot)
+                dropped += 1
+                continue
 
-            if sleep_time > 0:
-                time.sleep(sleep_time)
+            # Échéance de présentation de l'image sur l'horloge commune
+            deadline = start_time + pts
+            presenter.wait_until(deadline)
 
-        cap.release()
-        return True
+            with profiler.measure("blit"):
+                screen.blit(slot[1], (0, 0))
+            decoder.release(slot)
+            with profiler.measure("compose"):
+                if transition is not None:
+                    transition.apply(screen)
+                if overlay is not None:
+                    overlay(screen)
+            presenter.present(deadline, frame_duration)
 
     except Exception as e:
         print(f"❌ Erreur affichage vidéo {filepath}: {e}")
-        try:
-            cap.release()
-        except:
-            pass
-        return False
+        result = False
+    finally:
+        decoder.stop()
+
+    presented, missed, worst = presenter.take_stats()
+    print(f"📊 {os.path.basename(filepath)}: {decoder.decoded} décodées, {decoder.skipped} sautées, "
+          f"{presented} affichées, {dropped} abandonnées, {missed} en retard (pire +{worst * 1000:.0f} ms)")
+    return result
 
 # ==================== BOUCLE PRINCIPALE ====================
 
@@ -850,8 +1788,15 @@ def main():
     """Boucle principale d'affichage"""
     print("🚀 Démarrage de l'affichage dynamique JUNIA - Version combinée")
     
+    # Pages API
+    api_pages = [
+        ("bus", page_bus, API_PAGE_DURATION),
+        ("weather", page_weather, API_PAGE_DURATION),
+        ("vlille", page_vlille, API_PAGE_DURATION)
+    ]
+    
     # Initialiser gestionnaire de contenus serveur
-    content_manager = ContentManager()
+    content_manager = ContentManager([(name, duration) for name, _, duration in api_pages])
     
     # Test connexion serveur
     if not content_manager.test_server_connection():
@@ -859,47 +1804,123 @@ def main():
     
     # Synchronisation initiale
     content_manager.sync_contents()
-    content_manager.start_sync_thread()
+    content_manager.start_sync_thread(immediate=False)  # Première synchronisation déjà faite
     
-    # Mise à jour données API
+    # Mise à jour données API (puis toutes les API_UPDATE_INTERVAL secondes, hors boucle d'affichage)
     update_all_api_data()
+    api_service.start(immediate=False)
     
-    # Timer pour mise à jour API (toutes les 60s)
-    UPDATE_EVENT = pygame.USEREVENT + 1
-    pygame.time.set_timer(UPDATE_EVENT, 60000)
+    def request_refresh():
+        """Synchronisation manuelle : demande aux services de fond, sans attendre leur fin"""
+        started = [name for name, request in (("contenus", content_manager.request_sync),
+                                              ("données API", api_service.request)) if request()]
+        if started:
+            print(f"🔄 Synchronisation manuelle demandée ({', '.join(started)})")
+        else:
+            print("⏳ Synchronisation déjà en cours")
     
-    # Pages API
-    api_pages = [
-        ("bus", page_bus, API_PAGE_DURATION),
-        ("weather", page_weather, API_PAGE_DURATION),
-        ("vlille", page_vlille, API_PAGE_DURATION)
-    ]
+    def draw_status(target):
+        """Indicateur de synchronisation en cours"""
+        label = content_manager.sync_status()
+        if label is None and api_service.active():
+            label = "Mise à jour des données"
+        status_badge.draw(target, label)
+    
+    hotkeys = {pygame.K_SPACE: request_refresh, pygame.K_p: profiler.toggle, pygame.K_i: profiler.report}
+    
+    def prepare_upcoming():
+        """Pré-roll de la vidéo suivante et décodage anticipé des prochaines images"""
+        page_type, page_data, _ = playlist.peek(1)
+        if page_type == "media" and page_data['type'] == 'video':
+            video_preloader.preroll(page_data['filepath'], page_data['duration'])
+        
+        upcoming = []
+        for offset in range(len(playlist)):
+            page_type, page_data, _ = playlist.peek(offset)
+            if page_type == "media" and page_data['type'] == 'image' and page_data['filepath'] not in upcoming:
+                upcoming.append(page_data['filepath'])
+                if len(upcoming) >= MEDIA_PREFETCH_AHEAD:
+                    break
+        image_loader.prefetch(upcoming, (WIDTH, HEIGHT))
+    
+    def sync_playlist(media_contents):
+        """Recalcule le plan de cycle pondéré et l'applique à la liste de diffusion"""
+        pages = {name: (name, page, duration) for name, page, duration in api_pages}
+        items = [(name, 1, 1, None) for name, _, _ in api_pages]
+        for c in media_contents:
+            key = media_key(c['name'])
+            pages[key] = ("media", c, c['duration'])
+            items.append((key, c['weight'], c['min_per_cycle'], c['max_per_cycle']))
+        playlist.sync([(f"{key}#{k}", pages[key]) for key, k in plan_cycle(items)])
     
-    current_page_index = 0
-    page_start_time = time.time()
+    def interrupt_for(media_contents, previous):
+        """Contenu urgent nouvellement actif : passe en page suivante et coupe la page en cours"""
+        known = {c['name'] for c in previous}
+        for c in media_contents:
+            if c['interrupt'] and c['name'] not in known and playlist.cue(media_key(c['name']) + "#0"):
+                print(f"🚨 Contenu urgent: {c['name']}")
+                return True
+        return False
+    
+    def refresh_playlist(preroll=True):
+        """Applique une nouvelle liste de contenus ; True si un contenu urgent doit couper la page en cours"""
+        nonlocal media_source
+        media_contents = content_manager.get_available_contents()
+        if media_contents is media_source:
+            return False
+        sync_playlist(media_contents)
+        urgent = interrupt_for(media_contents, media_source)
+        media_source = media_contents
+        if preroll:
+            prepare_upcoming()
+        return urgent
+    
+    def start_page():
+        """Passe à la page suivante de la liste de diffusion"""
+        frames, missed, worst = presenter.take_stats()
+        if missed:
+            print(f"⏱️  {missed}/{frames} échéances d'image manquées (pire +{worst * 1000:.0f} ms)")
+        page = playlist.advance()
+        print(f"📄 Page {playlist.cursor + 1}/{len(playlist)}: {page[0]}")
+        if page[0] == "media":
+            content_manager.mark_played(page[1]['filepath'])
+        prepare_upcoming()
+        return page
+    
+    # Liste de diffusion persistante : modifiée seulement quand les contenus changent
+    playlist = Playlist()
+    media_source = content_manager.get_available_contents()
+    sync_playlist(media_source)
+    current_page = playlist.advance()
+    
+    page_start_time = presenter.now()
     last_content_check = 0
+    page_transition = Transition()
     
     running = True
     
     while running:
-        current_time = time.time()
+        # Cadence de la page (animation plus rapide si demandée), sans dépasser la fin de la page
+        # ni la prochaine borne de diffusion (ramenée sur l'horloge monotone, jamais en avance)
+        until_boundary = content_manager.next_boundary() - time.time()
+        limit = min(page_start_time + current_page[2], presenter.now() + until_boundary)
+        frame_deadline, frame_interval = presenter.wait_frame(PAGE_FPS.get(current_page[0], ANIMATION_FPS), limit)
+        current_time = presenter.now()
         
         # Gestion des événements
-        for event in pygame.event.get():
+        with profiler.measure("event"):
+            events = pygame.event.get()
+        for event in events:
             if event.type == pygame.QUIT:
                 running = False
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE or event.key == pygame.K_q:
                     running = False
-                elif event.key == pygame.K_SPACE:
-                    print("🔄 Synchronisation manuelle...")
-                    content_manager.sync_contents()
-                    update_all_api_data()
                 elif event.key == pygame.K_RIGHT:
                     # Forcer passage à la page suivante
                     page_start_time = 0
-            elif event.type == UPDATE_EVENT:
-                update_all_api_data()
+                elif event.key in hotkeys:
+                    hotkeys[event.key]()
         
         # Vérifier mise à jour contenus serveur (toutes les 30s)
         if current_time - last_content_check > 30:
@@ -908,38 +1929,26 @@ def main():
             if media_contents:
                 print(f"📋 {len(media_contents)} contenus média disponibles")
         
-        # Construire liste complète des pages (API + contenus serveur)
-        all_pages = list(api_pages)
+        # Contenus serveur : liste recompilée seulement sur changement (même objet sinon)
+        with profiler.measure("snapshot"):
+            if refresh_playlist():
+                page_start_time = 0
         
-        # Ajouter contenus serveur à la rotation
-        media_contents = content_manager.get_available_contents()
-        for content in media_contents:
-            all_pages.append(("media", content, content['duration']))
-        
-        if not all_pages:
-            # Aucune page disponible
-            screen.fill(BLACK)
-            err = font.render("Aucun contenu disponible", True, WHITE)
-            screen.blit(err, ((WIDTH - err.get_width()) // 2, HEIGHT // 2))
-            pygame.display.flip()
-            time.sleep(1)
-            continue
-        
-        # Gérer changement de page
-        current_page_type, current_page_data, duration = all_pages[current_page_index % len(all_pages)]
+        # Gérer changement de page (la page affichée reste la même jusqu'à la fin de sa durée)
+        current_page_type, current_page_data, duration = current_page
         
         if current_time - page_start_time >= duration:
             # Passer à la page suivante
-            current_page_index = (current_page_index + 1) % len(all_pages)
+            current_page = start_page()
+            current_page_type, current_page_data, duration = current_page
             page_start_time = current_time
-            current_page_type, current_page_data, duration = all_pages[current_page_index]
-            
-            print(f"📄 Page {current_page_index + 1}/{len(all_pages)}: {current_page_type}")
+            page_transition.start(screen)
         
         # Afficher la page actuelle
         if current_page_type in ["bus", "weather", "vlille"]:
             # Page API (avec panneau droit)
-            current_page_data()  # C'est une fonction
+            with profiler.measure("render"):
+                current_page_data()  # C'est une fonction
         
         elif current_page_type == "media":
             # Contenu serveur (plein écran)
@@ -949,20 +1958,28 @@ def main():
                 display_image_fullscreen(content['filepath'])
             
             elif content['type'] == 'video':
-                success = display_video_fullscreen(content['filepath'], content['duration'])
-                if success:
-                    # Vidéo terminée normalement, passer à la suivante
-                    current_page_index = (current_page_index + 1) % len(all_pages)
-                    page_start_time = current_time
-                else:
-                    # Erreur ou interruption, passer à la suivante
-                    current_page_index = (current_page_index + 1) % len(all_pages)
-                    page_start_time = current_time
+                # Vidéo terminée ou interrompue : passer à la suivante
+                # Un contenu urgent devenu actif pendant la vidéo l'arrête (pré-roll fait par start_page)
+                display_video_fullscreen(content['filepath'], content['duration'], page_transition,
+                                         hotkeys, draw_status, lambda: refresh_playlist(preroll=False))
+                current_page = start_page()
+                # La page suivante démarre à la fin de la vidéo (et non avant son début)
+                page_start_time = presenter.now()
+                page_transition.start(screen)
+                continue
         
-        pygame.display.flip()
-        clock.tick(30)
+        with profiler.measure("compose"):
+            page_transition.apply(screen)
+            draw_status(screen)
+        presenter.present(frame_deadline, frame_interval)
     
     # Nettoyage
+    print(f"⏱️  {presenter.total_frames} images affichées, {presenter.total_missed} échéances manquées")
+    if profiler.enabled:
+        profiler.report()
+    video_preloader.discard()
+    image_loader.stop()
+    api_service.stop()
     content_manager.stop()
     pygame.quit()
     print("👋 Affichage arrêté")
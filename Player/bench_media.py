@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Banc de mesure des chemins de décodage média
+Compare temps de décodage et hausse du pic mémoire (RSS) de chaque méthode, imports exclus
+
+Usage :
+    python bench_media.py photos/             # JPEG existants
+    python bench_media.py --generate          # Photos de test 12 à 24 MP
+    python bench_media.py --size 1280x720 photos/
+    python bench_media.py --video downloads/img1.mp4
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import tracemalloc
+import multiprocessing
+
+import numpy as np
+import cv2
+
+import media_tools
+
+try:
+    import resource
+except ImportError:
+    resource = None  # Windows : pic RSS non disponible
+
+# Photos de test générées (largeur, hauteur) : 12, 16, 20 et 24 MP
+TEST_PHOTO_SIZES = [(4000, 3000), (4608, 3456), (5472, 3648), (6000, 4000)]
+
+# ==================== MÉTHODES DE DÉCODAGE ====================
+
+def decode_full(filepath, size):
+    """Décodage pleine résolution puis réduction (chemin historique)"""
+    image = cv2.imread(filepath, cv2.IMREAD_COLOR)
+    return cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+
+def decode_reduced(filepath, size):
+    """Décodage réduit dans le domaine DCT puis réduction finale"""
+    return media_tools.decode_scaled(filepath, size)
+
+def decode_pygame(filepath, size):
+    """pygame.image.load puis smoothscale"""
+    import pygame
+    image = pygame.image.load(filepath)
+    return pygame.transform.smoothscale(image, size)
+
+METHODS = {
+    "plein": decode_full,
+    "reduit": decode_reduced,
+    "pygame": decode_pygame,
+}
+
+# ==================== MESURE ====================
+
+def peak_rss_kb():
+    """Pic mémoire du processus courant en Ko (None si indisponible)"""
+    # Linux : VmHWM est propre au processus, alors que ru_maxrss conserve à travers exec()
+    # le pic du parent (celui qui a généré les photos) et masquerait celui du décodage
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except (OSError, ValueError, IndexError):
+        pass
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS renvoie des octets, Linux des kilo-octets
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+def run_one(method, filepath, size, queue):
+    """Mesure une méthode dans un processus neuf : temps et hausse du pic RSS due au décodage"""
+    try:
+        if method == "pygame":
+            import pygame  # noqa: F401  Import (et sa mémoire) hors de la mesure
+        # Référence prise après les imports (cv2, numpy, pygame) : seul le décodage est compté
+        baseline = peak_rss_kb()
+        start = time.perf_counter()
+        METHODS[method](filepath, size)
+        elapsed = time.perf_counter() - start
+        peak = peak_rss_kb()
+        queue.put((elapsed, peak - baseline if peak is not None else None, None))
+    except Exception as e:
+        queue.put((None, None, str(e)))
+
+def measure(method, filepath, size):
+    """Lance la mesure dans un sous-processus et récupère le résultat"""
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    proc = ctx.Process(target=run_one, args=(method, filepath, size, queue))
+    proc.start()
+    result = queue.get()
+    proc.join()
+    return result
+
+def generate_photos(folder):
+    """Génère des JPEG de test de 12 à 24 MP (dégradé + bruit)"""
+    paths = []
+    rng = np.random.default_rng(0)
+    for w, h in TEST_PHOTO_SIZES:
+        path = os.path.join(folder, f"test_{w}x{h}.jpg")
+        x = np.linspace(0, 255, w, dtype=np.float32)
+        y = np.linspace(0, 255, h, dtype=np.float32)[:, None]
+        image = np.empty((h, w, 3), dtype=np.uint8)
+        image[..., 0] = (x + y) / 2
+        image[..., 1] = x[None, :].repeat(h, axis=0)
+        image[..., 2] = y.repeat(w, axis=1)
+        noise = rng.integers(0, 24, size=(h, w, 1), dtype=np.uint8)
+        cv2.add(image, noise.repeat(3, axis=2), dst=image)
+        cv2.imwrite(path, image, [cv2.IMWRITE_JPEG_QUALITY, 90])
+        paths.append(path)
+        print(f"🖼️  Généré: {path} ({w * h / 1e6:.0f} MP)")
+    return paths
+
+def bench_images(paths, size, methods):
+    """Affiche temps de décodage et hausse du pic RSS (au-delà des imports) pour chaque photo et méthode"""
+    print(f"\n📏 Cible {size[0]}x{size[1]}")
+    print(f"{'fichier':<28} {'MP':>5} {'méthode':<8} {'temps (ms)':>11} {'+pic RSS (Mo)':>14}")
+    for path in paths:
+        dims = media_tools.jpeg_size(path)
+        mp = f"{dims[0] * dims[1] / 1e6:.1f}" if dims else "?"
+        for method in methods:
+            elapsed, peak, error = measure(method, path, size)
+            name = os.path.basename(path)[:28]
+            if error:
+                print(f"{name:<28} {mp:>5} {method:<8} ❌ {error}")
+                continue
+            peak_txt = f"{peak / 1024:.0f}" if peak is not None else "n/d"
+            print(f"{name:<28} {mp:>5} {method:<8} {elapsed * 1000:>11.1f} {peak_txt:>14}")
+
+# ==================== VIDÉO ====================
+
+def video_frames_legacy(cap, size):
+    """Chemin historique : resize, cvtColor, swapaxes puis make_surface par image"""
+    import pygame
+
+    def step():
+        ret, frame = cap.read()
+        if not ret:
+            return False
+        frame = cv2.resize(frame, size, interpolation=cv2.INTER_NEAREST)
+        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        pygame.surfarray.make_surface(frame_rgb.swapaxes(0, 1))
+        return True
+    return step
+
+def video_frames_buffered(cap, size):
+    """Nouveau chemin : tampons préalloués et Surface persistante partageant la mémoire"""
+    import pygame
+    try:
+        pygame.image.frombuffer(bytes(3), (1, 1), 'BGR')
+        fmt = 'BGR'
+    except ValueError:
+        fmt = 'RGB'
+    reader = media_tools.FrameReader(cap, size, rgb=fmt == 'RGB')
+    buf = np.empty((size[1], size[0], 3), dtype=np.uint8)
+    pygame.image.frombuffer(buf, size, fmt)
+
+    def step():
+        return reader.read_into(buf)
+    return step
+
+VIDEO_PATHS = {
+    "historique": video_frames_legacy,
+    "tampons": video_frames_buffered,
+}
+
+def bench_video(path, size, max_frames):
+    """Mesure temps et octets alloués (numpy, via tracemalloc, Python 3.9+) par image vidéo"""
+    print(f"\n🎬 {os.path.basename(path)} -> {size[0]}x{size[1]} ({max_frames} images max)")
+    print(f"{'chemin':<12} {'images':>7} {'ms/image':>9} {'Ko alloués/image':>17}")
+    for name, factory in VIDEO_PATHS.items():
+        cap = cv2.VideoCapture(path, cv2.CAP_FFMPEG)
+        if not cap.isOpened():
+            print(f"❌ Impossible d'ouvrir la vidéo: {path}")
+            return
+        step = factory(cap, size)
+        step()  # Première image hors mesure (initialisation du décodeur)
+
+        tracemalloc.start()
+        allocated = 0
+        frames = 0
+        start = time.perf_counter()
+        while frames < max_frames:
+            before, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            if not step():
+                break
+            _, peak = tracemalloc.get_traced_memory()
+            allocated += peak - before
+            frames += 1
+        elapsed = time.perf_counter() - start
+        tracemalloc.stop()
+        cap.release()
+
+        if frames:
+            print(f"{name:<12} {frames:>7} {elapsed * 1000 / frames:>9.2f} {allocated / 1024 / frames:>17.0f}")
+    print("ℹ️  La Surface créée par make_surface (mémoire SDL) s'ajoute au chemin historique")
+
+# ==================== POINT D'ENTRÉE ====================
+
+def main():
+    parser = argparse.ArgumentParser(description="Banc de mesure du décodage média")
+    parser.add_argument("folder", nargs="?", help="Dossier de photos JPEG")
+    parser.add_argument("--generate", action="store_true", help="Générer des photos de test 12-24 MP")
+    parser.add_argument("--size", default="1920x1080", help="Taille cible LxH")
+    parser.add_argument("--methods", default="plein,reduit,pygame", help="Méthodes à comparer")
+    parser.add_argument("--video", help="Vidéo à mesurer (chemin par image)")
+    parser.add_argument("--frames", type=int, default=300, help="Images vidéo mesurées")
+    args = parser.parse_args()
+
+    size = tuple(int(v) for v in args.size.lower().split("x"))
+    methods = [m for m in args.methods.split(",") if m in METHODS]
+
+    if args.video:
+        bench_video(args.video, size, args.frames)
+        return
+
+    if args.generate:
+        folder = args.folder or tempfile.mkdtemp(prefix="bench_media_")
+        os.makedirs(folder, exist_ok=True)
+        paths = generate_photos(folder)
+    elif args.folder:
+        paths = sorted(
+            os.path.join(args.folder, name) for name in os.listdir(args.folder)
+            if name.lower().endswith((".jpg", ".jpeg"))
+        )
+    else:
+        parser.error("indiquer un dossier de photos ou --generate")
+
+    bench_images(paths, size, methods)
+
+if __name__ == "__main__":
+    main()
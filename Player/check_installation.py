@@ -15,6 +15,13 @@ def check_files():
     
     required_files = {
         "affichageDynamique.py": "Script principal",
+        "media_tools.py": "Outils média",
+        "playlist.py": "Liste de diffusion",
+        "downloader.py": "Téléchargements (reprise HTTP Range)",
+        "schedule.py": "Fenêtres de diffusion",
+        "store.py": "Stockage local des contenus",
+        "services.py": "Services d'arrière-plan",
+        "profiler.py": "Profilage",
         "README.md": "Documentation",
         "requirements.txt": "Dépendances Python"
     }
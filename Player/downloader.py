@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Téléchargement des contenus de l'affichage dynamique JUNIA
+Flux par blocs, reprise HTTP Range / If-Range, renommage atomique, ordonnancement parallèle
+(sans pygame, testable isolément)
+"""
+
+import os
+import json
+import time
+import hashlib
+import requests
+from urllib.parse import urlparse
+from threading import Thread, Condition
+from datetime import datetime
+
+from schedule import parse_date
+
+CHUNK_SIZE = 256 * 1024  # Blocs de 256 Ko
+TIMEOUT = (10, 30)  # Connexion, puis délai maximal entre deux blocs reçus
+WORKERS = 3  # Téléchargements simultanés
+PER_HOST = 2  # Connexions simultanées maximum vers un même serveur
+
+# ==================== FICHIERS ====================
+
+def load_json(path):
+    """Lit un fichier JSON local (None si absent ou illisible)"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def save_json(path, data):
+    """Écrit un fichier JSON de manière atomique"""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+def fsync_dir(path):
+    """Force l'écriture sur disque d'un renommage dans un dossier (POSIX)"""
+    if os.name != "posix":
+        return
+    fd = os.open(path or ".", os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def file_md5(path, chunk_size=CHUNK_SIZE):
+    """Empreinte md5 d'un fichier, lu par blocs"""
+    digest = hashlib.md5()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(chunk_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def rss_mb():
+    """Mémoire résidente actuelle du processus en Mo (None hors Linux)"""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return pages * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+
+# ==================== TÉLÉCHARGEMENT ====================
+
+def discard_partial(tmp_path):
+    """Supprime un téléchargement partiel et ses validateurs"""
+    for path in (tmp_path, tmp_path + ".json"):
+        if os.path.exists(path):
+            os.remove(path)
+
+def finalize(tmp_path, filepath):
+    """Rend visible un fichier complet : renommage atomique, validateurs supprimés"""
+    os.replace(tmp_path, filepath)
+    fsync_dir(os.path.dirname(filepath))
+    if os.path.exists(tmp_path + ".json"):
+        os.remove(tmp_path + ".json")
+
+def download_file(url, filepath, conditional=None, md5=None, chunk_size=CHUNK_SIZE, timeout=TIMEOUT,
+                  running=None):
+    """Téléchargement en flux (mémoire bornée), reprise HTTP Range, renommage atomique
+
+    Retourne les validateurs HTTP du fichier reçu, ou False (échec ou fichier inchangé).
+    md5 : empreinte attendue (finalise sans requête un partiel déjà complet) ;
+    running() : False interrompt le transfert (partiel conservé pour reprise)
+    """
+    filename = os.path.basename(filepath)
+    tmp_path = filepath + ".part"
+    meta_path = tmp_path + ".json"
+    start = time.time()
+    rss_before = rss_peak = rss_mb()
+
+    # Téléchargement partiel précédent : reprise si même URL
+    meta = load_json(meta_path) or {}
+    offset = os.path.getsize(tmp_path) if os.path.exists(tmp_path) else 0
+    if meta.get('url') != url:
+        meta, offset = {'url': url}, 0
+
+    # Partiel complet (coupure entre fsync et renommage) : finalisé sans retéléchargement
+    if offset and offset == meta.get('size') and md5 and file_md5(tmp_path, chunk_size) == md5:
+        finalize(tmp_path, filepath)
+        print(f"✅ Partiel complet finalisé: {filename}")
+        return meta
+
+    headers = {'Accept-Encoding': 'identity'}
+    headers.update(conditional or {})
+    # If-Range n'accepte qu'un ETag fort ; sinon la date de modification
+    etag = meta.get('etag')
+    validator = etag if etag and not etag.startswith('W/') else meta.get('last_modified')
+    if offset > 0 and validator:
+        headers['Range'] = f"bytes={offset}-"
+        headers['If-Range'] = validator
+
+    with requests.get(url, stream=True, timeout=timeout, headers=headers) as response:
+        etag = response.headers.get('ETag')
+        if response.status_code == 304:
+            return False  # Inchangé depuis le dernier téléchargement
+        if response.status_code == 206:
+            content_range = response.headers.get('Content-Range', '')
+            if (etag and etag != meta.get('etag')) or not content_range.startswith(f"bytes {offset}-"):
+                # Partie d'une autre version ou plage inattendue : repartir de zéro au prochain essai
+                discard_partial(tmp_path)
+                raise IOError(f"reprise refusée ({content_range or 'Content-Range absent'})")
+            length = content_range.rsplit('/', 1)[-1]
+            total = int(length) if length.isdigit() else None
+            print(f"⏯️  Reprise: {filename} à {offset / 1e6:.1f} Mo")
+        elif response.status_code == 200:
+            if offset > 0:
+                print(f"🔁 {filename} modifié ou reprise non supportée : téléchargement depuis le début")
+            offset = 0
+            length = response.headers.get('Content-Length')
+            total = int(length) if length else None
+        elif response.status_code == 416:
+            # If-Range vérifié avant la plage : le partiel est de la version courante.
+            # S'il a exactement la taille distante, il est complet (vérifié ensuite par md5)
+            remote = response.headers.get('Content-Range', '').rsplit('/', 1)[-1]
+            if offset and remote.isdigit() and int(remote) == offset:
+                finalize(tmp_path, filepath)
+                print(f"✅ Partiel complet finalisé: {filename}")
+                return meta
+            # Partiel plus grand que le fichier distant : repartir de zéro au prochain essai
+            discard_partial(tmp_path)
+            print(f"❌ Plage refusée pour {filename}, partiel supprimé")
+            return False
+        else:
+            print(f"❌ Erreur téléchargement {filename}: {response.status_code}")
+            return False
+
+        # Validateurs conservés pour pouvoir reprendre après une coupure
+        meta.update(size=total, etag=etag, last_modified=response.headers.get('Last-Modified'))
+        save_json(meta_path, meta)
+
+        size = offset
+        with open(tmp_path, 'ab' if offset else 'wb') as f:
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                if running is not None and not running():
+                    raise IOError("arrêt demandé")
+                f.write(chunk)
+                size += len(chunk)
+                if rss_before is not None:
+                    rss_peak = max(rss_peak, rss_mb() or 0)
+            f.flush()
+            os.fsync(f.fileno())
+
+    # Taille annoncée non atteinte : transfert tronqué, le partiel est gardé pour reprise
+    if total is not None and size != total:
+        raise IOError(f"transfert incomplet ({size}/{total} octets)")
+
+    # Le fichier final n'apparaît qu'une fois complet et sur disque
+    finalize(tmp_path, filepath)
+
+    elapsed = max(time.time() - start, 1e-6)
+    received = size - offset
+    # Mémoire du processus entier (téléchargements parallèles et affichage compris), relevée à chaque bloc :
+    # une hausse durable signale un transfert qui n'est plus borné en mémoire
+    rss_txt = f", pic RSS du processus +{rss_peak - rss_before:.1f} Mo pendant le transfert" \
+        if rss_before is not None else ""
+    print(f"✅ Téléchargé: {filename} ({size / 1e6:.1f} Mo, {received / 1e6:.1f} Mo reçus en {elapsed:.1f}s, "
+          f"{received / 1e6 / elapsed:.2f} Mo/s{rss_txt})")
+    return meta
+
+# ==================== ORDONNANCEMENT ====================
+
+class DownloadScheduler:
+    """Téléchargements parallèles bornés, ordonnés par urgence et limités par serveur"""
+
+    def __init__(self, download, workers=WORKERS, per_host=PER_HOST, first_slot=None, position=None):
+        self.download = download  # fonction (contenu, chemin) -> bool
+        self.workers = workers
+        self.per_host = per_host
+        self.first_slot = first_slot  # fonction (contenu) -> timestamp de la première diffusion prévue
+        self.position = position  # fonction (contenu) -> place du premier passage dans le cycle de diffusion
+        self.progress = (0, 0)  # (terminés, demandés) du lot en cours, pour l'indicateur à l'écran
+
+    def urgency(self, content, position, now):
+        """Clé de tri : priorité, délai avant la première diffusion prévue, place dans la rotation"""
+        planned = self.first_slot(content) if self.first_slot else float('inf')
+        if planned != float('inf'):
+            wait = max(0.0, planned - now.timestamp())
+        else:
+            start = parse_date(content.get('start_date'))
+            wait = max(0.0, (start - now).total_seconds()) if start else 0.0
+        return (-content['priority'], wait, position)
+
+    def run(self, jobs):
+        """Télécharge les (contenu, chemin) demandés, retourne le nombre de succès"""
+        if not jobs:
+            return 0
+
+        self.progress = (0, len(jobs))
+        now = datetime.now()
+        # Place dans le cycle de diffusion (inconnue : ordre du manifeste, départagé par l'indice)
+        pending = sorted(
+            (self.urgency(content, self.position(content) if self.position else float('inf'), now),
+             i, content, filepath, urlparse(content['url']).netloc)
+            for i, (content, filepath) in enumerate(jobs)
+        )
+        active = {}
+        results = []
+        cond = Condition()
+
+        def worker():
+            while True:
+                with cond:
+                    job = None
+                    while job is None:
+                        if not pending:
+                            return
+                        # Tâche la plus urgente dont le serveur a encore une connexion libre
+                        for i, item in enumerate(pending):
+                            if active.get(item[4], 0) < self.per_host:
+                                job = pending.pop(i)
+                                break
+                        if job is None:
+                            cond.wait()
+                    host = job[4]
+                    active[host] = active.get(host, 0) + 1
+
+                try:
+                    ok = self.download(job[2], job[3])
+                except Exception as e:
+                    print(f"❌ Erreur téléchargement {job[2]['name']}: {e}")
+                    ok = False
+
+                with cond:
+                    active[host] -= 1
+                    results.append(ok)
+                    self.progress = (len(results), len(jobs))
+                    cond.notify_all()
+
+        threads = [Thread(target=worker, daemon=True) for _ in range(min(self.workers, len(jobs)))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return sum(results)
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Outils média de l'affichage dynamique JUNIA
+Fonctions exécutées dans des processus de travail (sans pygame ni fenêtre)
+"""
+
+import os
+import re
+import struct
+import cv2
+import numpy as np
+
+# Extension des renditions brutes (pixels RGB 24 bits, sans en-tête)
+RENDITION_EXT = ".rgb"
+# Extension des renditions vidéo transcodées
+VIDEO_RENDITION_EXT = ".mp4"
+
+# Nom d'une rendition : <original>.<L>x<H><extension>
+RENDITION_PATTERN = re.compile(r"^(.+)\.\d+x\d+(?:%s|%s)$" % (re.escape(RENDITION_EXT), re.escape(VIDEO_RENDITION_EXT)))
+
+# Facteurs de décodage réduit JPEG (mise à l'échelle dans le domaine DCT)
+REDUCED_DECODE_FLAGS = [
+    (8, cv2.IMREAD_REDUCED_COLOR_8),
+    (4, cv2.IMREAD_REDUCED_COLOR_4),
+    (2, cv2.IMREAD_REDUCED_COLOR_2),
+]
+
+# Orientations EXIF à rotation d'un quart de tour : largeur et hauteur échangées à l'affichage
+EXIF_TRANSPOSED = (5, 6, 7, 8)
+
+# ==================== DÉCODAGE IMAGES ====================
+
+def exif_orientation(segment):
+    """Orientation EXIF (1 à 8) d'un segment APP1, ou None"""
+    if not segment.startswith(b'Exif\x00\x00'):
+        return None
+    tiff = segment[6:]
+    order = {b'II': '<', b'MM': '>'}.get(tiff[:2])
+    if order is None:
+        return None
+    try:
+        offset = struct.unpack(order + "I", tiff[4:8])[0]
+        count = struct.unpack(order + "H", tiff[offset:offset + 2])[0]
+        for i in range(count):
+            entry = offset + 2 + i * 12
+            tag, kind = struct.unpack(order + "HH", tiff[entry:entry + 4])
+            if tag == 0x0112 and kind == 3:  # Orientation, SHORT
+                return struct.unpack(order + "H", tiff[entry + 8:entry + 10])[0]
+    except struct.error:
+        return None
+    return None
+
+def jpeg_size(filepath):
+    """Lit les dimensions d'un JPEG dans son en-tête, retourne (w, h) après orientation EXIF, ou None"""
+    orientation = None
+    try:
+        with open(filepath, 'rb') as f:
+            if f.read(2) != b'\xff\xd8':
+                return None
+            while True:
+                marker = f.read(2)
+                if len(marker) < 2 or marker[0] != 0xFF:
+                    return None
+                # Octets de remplissage entre segments
+                while marker[1] == 0xFF:
+                    marker = marker[1:] + f.read(1)
+                code = marker[1]
+                if code in (0xD8, 0x01) or 0xD0 <= code <= 0xD7:
+                    continue
+                length = struct.unpack(">H", f.read(2))[0]
+                # Marqueurs SOF (hors DHT, JPG, DAC)
+                if 0xC0 <= code <= 0xCF and code not in (0xC4, 0xC8, 0xCC):
+                    h, w = struct.unpack(">xHH", f.read(5))
+                    # OpenCV applique l'orientation EXIF au décodage
+                    return (h, w) if orientation in EXIF_TRANSPOSED else (w, h)
+                if code == 0xE1 and orientation is None:
+                    orientation = exif_orientation(f.read(length - 2))
+                    continue
+                f.seek(length - 2, os.SEEK_CUR)
+    except (OSError, IndexError, struct.error):
+        return None
+
+def decode_image(filepath, size):
+    """Décode une image (BGR) au plus près de la taille cible"""
+    tw, th = size
+    flag = cv2.IMREAD_COLOR
+
+    # Décodage réduit si le JPEG source est au moins 2x plus grand que la cible
+    dims = jpeg_size(filepath)
+    if dims:
+        w, h = dims
+        for factor, reduced_flag in REDUCED_DECODE_FLAGS:
+            if w // factor >= tw and h // factor >= th:
+                flag = reduced_flag
+                break
+
+    image = cv2.imread(filepath, flag)
+    if image is None:
+        raise ValueError(f"Image illisible: {filepath}")
+    return image
+
+def decode_scaled(filepath, size):
+    """Décode puis redimensionne une image (BGR) à la taille exacte"""
+    image = decode_image(filepath, size)
+    if (image.shape[1], image.shape[0]) != tuple(size):
+        image = cv2.resize(image, tuple(size), interpolation=cv2.INTER_AREA)
+    return image
+
+# ==================== RENDITIONS ====================
+
+def rendition_path(filepath, size, ext=RENDITION_EXT):
+    """Chemin de la rendition d'un fichier pour une taille donnée"""
+    w, h = size
+    return f"{filepath}.{w}x{h}{ext}"
+
+def rendition_source(filename):
+    """Nom du fichier d'origine d'une rendition (None si ce n'est pas une rendition)"""
+    match = RENDITION_PATTERN.match(filename)
+    return match.group(1) if match else None
+
+def rendition_ready(filepath, size):
+    """Rendition présente et à jour, vérifiée par stat seulement (taille attendue, date postérieure)"""
+    w, h = size
+    try:
+        stat = os.stat(rendition_path(filepath, size))
+        return stat.st_size == w * h * 3 and stat.st_mtime >= os.path.getmtime(filepath)
+    except OSError:
+        return False
+
+def load_rendition(filepath, size):
+    """Lit une rendition brute, retourne les octets RGB ou None"""
+    path = rendition_path(filepath, size)
+    try:
+        if os.path.getmtime(path) < os.path.getmtime(filepath):
+            return None  # Original modifié depuis
+        with open(path, 'rb') as f:
+            data = f.read()
+    except OSError:
+        return None
+
+    w, h = size
+    if len(data) != w * h * 3:
+        return None
+    return data
+
+def decode_rgb(filepath, size):
+    """Pixels RGB bruts d'une image à la taille voulue (rendition si disponible)"""
+    data = load_rendition(filepath, size)
+    if data is None:
+        data = cv2.cvtColor(decode_scaled(filepath, size), cv2.COLOR_BGR2RGB).tobytes()
+    return data
+
+def make_renditions(filepath, sizes):
+    """Génère les renditions RGB brutes d'une image pour chaque taille (un seul décodage)"""
+    missing = [tuple(size) for size in sizes if not rendition_ready(filepath, size)]
+    if not missing:
+        return []
+
+    # Décodage unique (réduit si possible) à la taille couvrant toutes les renditions,
+    # puis une réduction par taille depuis cette même image
+    cover = (max(w for w, _ in missing), max(h for _, h in missing))
+    image = decode_image(filepath, cover)
+
+    written = []
+    for size in missing:
+        path = rendition_path(filepath, size)
+        scaled = image
+        if (image.shape[1], image.shape[0]) != size:
+            scaled = cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+        rgb = cv2.cvtColor(scaled, cv2.COLOR_BGR2RGB)
+
+        # Écriture atomique : le lecteur ne voit jamais de rendition partielle
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(rgb.tobytes())
+        os.replace(tmp_path, path)
+        written.append(path)
+
+    return written
+
+# ==================== TRANSCODAGE VIDÉO ====================
+
+def video_fps(filepath):
+    """FPS annoncé par une vidéo (None si inconnu)"""
+    cap = cv2.VideoCapture(filepath, cv2.CAP_FFMPEG)
+    try:
+        fps = cap.get(cv2.CAP_PROP_FPS)
+    finally:
+        cap.release()
+    return fps if fps and 0 < fps <= 1000 else None
+
+def transcode_command(src, dst, size, max_fps, ffmpeg="ffmpeg"):
+    """Commande ffmpeg produisant une rendition à la taille écran, rapide à décoder"""
+    w, h = size
+    fps = video_fps(src)
+    filters = [f"scale={w}:{h}"]
+    if fps is None or fps > max_fps:
+        filters.append(f"fps={max_fps}")
+        fps = max_fps
+    return [
+        ffmpeg, "-y", "-v", "error", "-i", src,
+        "-an", "-vf", ",".join(filters),
+        # H.264 baseline sans CABAC ni filtre de déblocage : décodage le plus léger
+        "-c:v", "libx264", "-preset", "veryfast", "-tune", "fastdecode",
+        "-profile:v", "baseline", "-pix_fmt", "yuv420p",
+        "-g", str(max(1, int(round(fps)))),
+        "-movflags", "+faststart", "-f", "mp4", dst,
+    ]
+
+# ==================== LECTURE VIDÉO ====================
+
+class FrameReader:
+    """Décode les images d'une vidéo dans des tampons préalloués (aucune allocation par image)"""
+
+    def __init__(self, cap, size, rgb=False, pregrabbed=False):
+        self.cap = cap
+        self.size = tuple(size)
+        self.rgb = rgb
+        # Première image déjà démultiplexée à l'ouverture (pré-roll)
+        self.pregrabbed = pregrabbed
+        w = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        h = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        self.native_size = (w, h)
+        self.frame_buf = np.empty((h, w, 3), dtype=np.uint8)
+        # Tampon intermédiaire à la taille cible quand une conversion RGB suit le redimensionnement
+        self.scaled_buf = np.empty((self.size[1], self.size[0], 3), dtype=np.uint8) if rgb else None
+
+    def grab(self):
+        """Démultiplexe l'image suivante sans la convertir"""
+        if self.pregrabbed:
+            self.pregrabbed = False
+            return True
+        return self.cap.grab()
+
+    def retrieve_into(self, dst):
+        """Convertit l'image saisie dans dst (tableau H x W x 3 à la taille cible)"""
+        direct = self.native_size == self.size and not self.rgb
+        target = dst if direct else self.frame_buf
+        ok, frame = self.cap.retrieve(target)
+        if not ok:
+            return False
+
+        if frame is not target:
+            # Taille annoncée erronée : OpenCV a alloué un autre tampon, on l'adopte
+            self.frame_buf = frame
+            self.native_size = (frame.shape[1], frame.shape[0])
+            direct = False
+        if direct:
+            return True
+
+        src = self.frame_buf
+        if self.native_size != self.size:
+            scaled = self.scaled_buf if self.rgb else dst
+            cv2.resize(src, self.size, dst=scaled, interpolation=cv2.INTER_NEAREST)
+            src = scaled
+        if self.rgb:
+            cv2.cvtColor(src, cv2.COLOR_BGR2RGB, dst=dst)
+        elif src is not dst:
+            np.copyto(dst, src)
+        return True
+
+    def read_into(self, dst):
+        """Décode l'image suivante dans dst, retourne False en fin de flux"""
+        return self.grab() and self.retrieve_into(dst)
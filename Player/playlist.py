@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Liste de diffusion de l'affichage dynamique JUNIA
+Structure sans pygame ni réseau (testable isolément)
+"""
+
+import os
+import json
+import bisect
+from datetime import datetime
+
+# ==================== LISTE DE DIFFUSION ====================
+
+class Playlist:
+    """Liste de diffusion persistante à curseur stable (insertions et retraits explicites)"""
+
+    def __init__(self):
+        self.keys = []
+        self.pages = []
+        self.cursor = 0
+        # Page courante retirée (ou aucune page affichée) : le curseur désigne déjà la suivante
+        self.detached = True
+
+    def __len__(self):
+        return len(self.pages)
+
+    def index(self, key):
+        """Position d'une page, ou -1"""
+        try:
+            return self.keys.index(key)
+        except ValueError:
+            return -1
+
+    def current(self):
+        """Page affichée, ou None"""
+        if self.detached or not self.pages:
+            return None
+        return self.pages[self.cursor]
+
+    def peek(self, offset=1):
+        """Page située offset pages après la page courante (None si liste vide)"""
+        if not self.pages:
+            return None
+        base = self.cursor - 1 if self.detached else self.cursor
+        return self.pages[(base + offset) % len(self.pages)]
+
+    def advance(self):
+        """Passe à la page suivante et la retourne"""
+        if not self.pages:
+            self.cursor = 0
+            self.detached = True
+            return None
+        if self.detached:
+            self.detached = False
+            self.cursor %= len(self.pages)
+        else:
+            self.cursor = (self.cursor + 1) % len(self.pages)
+        return self.pages[self.cursor]
+
+    def insert(self, key, page, position=None):
+        """Insère une page (en fin par défaut) sans changer la page courante ni la suivante"""
+        if position is None or position > len(self.pages):
+            position = len(self.pages)
+        self.keys.insert(position, key)
+        self.pages.insert(position, page)
+        # Insertion juste après une page retirée : la nouvelle page passe en suivante
+        if position < self.cursor or (position == self.cursor and not self.detached):
+            self.cursor += 1
+
+    def remove(self, key):
+        """Retire une page ; si c'était la page courante, le curseur désigne la suivante"""
+        i = self.index(key)
+        if i < 0:
+            return False
+        del self.keys[i]
+        del self.pages[i]
+        if i < self.cursor:
+            self.cursor -= 1
+        elif i == self.cursor:
+            self.detached = True
+        if self.cursor >= len(self.pages):
+            self.cursor = 0
+        return True
+
+    def update(self, key, page):
+        """Remplace une page sur place"""
+        i = self.index(key)
+        if i < 0:
+            return False
+        self.pages[i] = page
+        return True
+
+    def move(self, key, position):
+        """Déplace une page sans changer la page courante ni la suivante"""
+        i = self.index(key)
+        if i < 0 or i == position:
+            return
+        anchor = self.keys[self.cursor] if self.pages else None
+        self.keys.insert(position, self.keys.pop(i))
+        self.pages.insert(position, self.pages.pop(i))
+        if anchor is not None:
+            self.cursor = self.keys.index(anchor)
+
+    def sync(self, entries):
+        """Aligne la liste sur entries [(clé, page)] par retraits, insertions, déplacements et mises à jour"""
+        wanted = {key for key, _ in entries}
+        for key in [key for key in self.keys if key not in wanted]:
+            self.remove(key)
+
+        for position, (key, page) in enumerate(entries):
+            i = self.index(key)
+            if i < 0:
+                self.insert(key, page, position)
+                continue
+            if i != position:
+                self.move(key, position)
+            if self.pages[position] != page:
+                self.pages[position] = page
+
+    def cue(self, key):
+        """Fait d'une page la suivante (passage immédiat au prochain advance)"""
+        i = self.index(key)
+        if i < 0:
+            return False
+        self.cursor = i
+        self.detached = True
+        return True
+
+# ==================== PLANIFICATION ====================
+
+def plan_cycle(items):
+    """Plan d'un cycle [(clé, numéro de passage)], passages entrelacés sans répétition consécutive"""
+    # items : [(clé, poids, minimum, maximum)] ; poids = passages par cycle
+    # (1 = une page API), borné par minimum et maximum (None : sans limite).
+    # Tourniquet pondéré lissé : chaque élément accumule son nombre de passages, le plus
+    # avancé passe et rend le total. Le cycle est rejoué en boucle : un élément ne suit
+    # jamais lui-même, y compris entre la fin d'un cycle et le début du suivant (sauf
+    # s'il occupe plus de la moitié du cycle). À égalité, l'ordre de items est conservé
+    counts = []
+    for key, weight, low, high in items:
+        count = max(low or 0, int(round(weight)))
+        if high is not None:
+            count = min(count, high)
+        counts.append(count)
+
+    total = sum(counts)
+    remaining = list(counts)
+    credit = [0] * len(items)
+    plan = []
+    previous = first = None
+    for step in range(total):
+        left = total - step
+        for i, count in enumerate(counts):
+            if remaining[i]:
+                credit[i] += count
+        candidates = [i for i in range(len(items)) if remaining[i] and i != previous]
+        # Élément qui ne pourrait plus placer ses passages sans répétition s'il attendait :
+        # passages non adjacents sur les places restantes (sans la dernière s'il ouvre le cycle)
+        forced = [i for i in candidates if remaining[i] > (left - (2 if i == first else 1) + 1) // 2]
+        if forced:
+            candidates = forced
+        if not candidates:
+            candidates = [i for i in range(len(items)) if remaining[i]]
+        pick = max(candidates, key=lambda i: (credit[i], -i))
+        credit[pick] -= total
+        plan.append((items[pick][0], counts[pick] - remaining[pick]))
+        remaining[pick] -= 1
+        previous = pick
+        if first is None:
+            first = pick
+    return plan
+
+# ==================== LIGNE DE TEMPS ====================
+
+class Timeline:
+    """Plan de diffusion précalculé (24 h), recompilé segment par segment entre deux bornes d'activation"""
+
+    def __init__(self, horizon=24 * 3600):
+        self.horizon = horizon
+        self.segments = {}  # signature du segment -> créneaux [(début, fin, clé)]
+        self.items = {}
+        self.slots = []
+        self.starts = []
+        self.first = {}  # clé -> début du premier créneau
+        self.recompiled = 0  # Segments recalculés lors de la dernière compilation
+
+    def compile(self, items, now):
+        """Compile le plan ; items : [{'key', 'name', 'type', 'duration', 'weight', 'min', 'max', 'start', 'end'}]"""
+        # start / end : timestamps (None = sans limite), end exclusif
+        # Origine à l'heure pleine : les segments déjà calculés restent réutilisables d'une compilation à l'autre
+        origin = now - now % 3600
+        limit = origin + self.horizon + 3600
+        events = {}
+        initial = []
+        for index, item in enumerate(items):
+            start, end = item.get('start'), item.get('end')
+            if end is not None and (end <= origin or (start is not None and end <= start)):
+                continue
+            if start is None or start <= origin:
+                initial.append(index)
+            elif start < limit:
+                events.setdefault(start, ([], []))[0].append(index)
+            else:
+                continue
+            if end is not None and end < limit:
+                events.setdefault(end, ([], []))[1].append(index)
+
+        bounds = [origin] + sorted(events) + [limit]
+        active = set(initial)
+        segments = {}
+        slots = []
+        self.recompiled = 0
+        for i in range(len(bounds) - 1):
+            if i > 0:
+                started, ended = events[bounds[i]]
+                active.difference_update(ended)
+                active.update(started)
+            members = [items[j] for j in sorted(active)]
+            signature = (bounds[i], bounds[i + 1], tuple(
+                (m['key'], m['duration'], m['weight'], m['min'], m['max']) for m in members))
+            segment = self.segments.get(signature)
+            if segment is None:
+                segment = self.fill(members, bounds[i], bounds[i + 1])
+                self.recompiled += 1
+            segments[signature] = segment
+            slots.extend(segment)
+
+        first = {}
+        for start, end, key in slots:
+            if key not in first and end > now:
+                first[key] = start
+
+        # Remplacement en bloc : les autres threads ne voient jamais un plan à moitié construit
+        self.segments = segments  # Les segments disparus sont oubliés
+        self.items = {item['key']: item for item in items}
+        self.slots, self.starts, self.first = slots, [slot[0] for slot in slots], first
+        return self.recompiled
+
+    @staticmethod
+    def fill(members, start, end):
+        """Créneaux d'un segment : cycles successifs du plan pondéré, le dernier tronqué à la borne"""
+        plan = plan_cycle([(m['key'], m['weight'], m['min'], m['max']) for m in members])
+        durations = {m['key']: max(1, m['duration']) for m in members}
+        slots = []
+        t = start
+        while plan and t < end:
+            for key, _ in plan:
+                if t >= end:
+                    break
+                slots.append((t, min(t + durations[key], end), key))
+                t += durations[key]
+        return slots
+
+    def at(self, timestamp):
+        """Créneau prévu à un instant (début, fin, clé), ou None"""
+        i = bisect.bisect_right(self.starts, timestamp) - 1
+        if i < 0 or timestamp >= self.slots[i][1]:
+            return None
+        return self.slots[i]
+
+    def first_slot(self, key):
+        """Début du premier créneau à venir d'un élément (inf s'il n'est pas prévu dans l'horizon)"""
+        return self.first.get(key, float('inf'))
+
+    def export(self, path):
+        """Écrit le plan en JSON (inspection, supervision)"""
+        plan = []
+        for start, end, key in self.slots:
+            item = self.items.get(key, {})
+            plan.append({
+                'start': datetime.fromtimestamp(start).isoformat(timespec='seconds'),
+                'end': datetime.fromtimestamp(end).isoformat(timespec='seconds'),
+                'key': key,
+                'name': item.get('name', key),
+                'type': item.get('type'),
+            })
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(plan, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, path)
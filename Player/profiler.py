@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Profilage de l'affichage dynamique JUNIA
+Minuteurs des sections critiques, percentiles glissants (sans pygame, testable isolément)
+"""
+
+import time
+import collections
+from threading import RLock
+
+WINDOW = 1000  # Mesures conservées par minuteur
+
+# ==================== MINUTEURS ====================
+
+class NullTimer:
+    """Minuteur inactif (profilage désactivé) : aucun coût hormis l'appel"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+class Timer:
+    """Mesure d'une section, enregistrée à la sortie du bloc with"""
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.record(self.name, time.perf_counter() - self.start)
+        return False
+
+class Profiler:
+    """Minuteurs des sections critiques, percentiles glissants p50 / p95 / p99"""
+
+    def __init__(self, enabled=False, window=WINDOW):
+        self.enabled = enabled
+        self.window = window
+        self.lock = RLock()  # Réentrant : le rapport peut être demandé par signal pendant une mesure
+        self.samples = {}  # nom -> durées récentes (secondes)
+        self.null = NullTimer()
+
+    def measure(self, name):
+        """Minuteur pour un bloc with (inactif si le profilage est désactivé)"""
+        return Timer(self, name) if self.enabled else self.null
+
+    def record(self, name, seconds):
+        with self.lock:
+            samples = self.samples.get(name)
+            if samples is None:
+                samples = self.samples[name] = collections.deque(maxlen=self.window)
+            samples.append(seconds)
+
+    def toggle(self):
+        """Active ou désactive le profilage (mesures remises à zéro à l'activation)"""
+        if not self.enabled:
+            with self.lock:
+                self.samples = {}
+        self.enabled = not self.enabled
+        print(f"⏱️  Profilage {'activé' if self.enabled else 'désactivé'}")
+
+    def report(self):
+        """Affiche les percentiles de chaque minuteur (millisecondes)"""
+        with self.lock:
+            snapshot = {name: sorted(samples) for name, samples in self.samples.items()}
+        if not snapshot:
+            print(f"⏱️  Aucune mesure (profilage {'activé' if self.enabled else 'désactivé'})")
+            return
+        print(f"⏱️  {'section':<18}{'n':>6}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}  (ms)")
+        for name in sorted(snapshot):
+            values = snapshot[name]
+            n = len(values)
+            p50, p95, p99 = (values[min(n - 1, int(q * n))] * 1000 for q in (0.50, 0.95, 0.99))
+            print(f"   {name:<18}{n:>6}{p50:>9.1f}{p95:>9.1f}{p99:>9.1f}{values[-1] * 1000:>9.1f}")
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Fenêtres de diffusion de l'affichage dynamique JUNIA
+Index des dates de début et de fin des contenus (sans pygame ni réseau, testable isolément)
+"""
+
+import bisect
+from datetime import datetime
+
+# ==================== FENÊTRES DE DIFFUSION ====================
+
+def parse_date(value):
+    """Date ISO du serveur, ou None si absente ou invalide"""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+
+def window(content):
+    """Fenêtre de diffusion en timestamps (début, fin exclusive), None si non bornée"""
+    start = parse_date(content.get('start_date'))
+    end = parse_date(content.get('end_date'))
+    # Une fin de diffusion s'applique strictement après end_date
+    return (start.timestamp() if start else None), (end.timestamp() + 0.001 if end else None)
+
+class ScheduleIndex:
+    """Index des fenêtres de diffusion : bornes triées, contenus actifs mis à jour de borne en borne"""
+
+    def __init__(self, contents):
+        self.contents = contents
+        events = {}
+        self.initial = []  # Actifs avant la première borne (sans start_date)
+        for index, content in enumerate(contents):
+            start, end = window(content)
+            if start is not None and end is not None and end <= start:
+                continue  # Fenêtre vide
+            if start is None:
+                self.initial.append(index)
+            else:
+                events.setdefault(start, ([], []))[0].append(index)
+            if end is not None:
+                events.setdefault(end, ([], []))[1].append(index)
+
+        self.bounds = sorted(events)
+        self.starts_at = [events[bound][0] for bound in self.bounds]
+        self.ends_at = [events[bound][1] for bound in self.bounds]
+        self.segment = None
+        self.active = set()
+
+    def seek(self, segment):
+        """Place l'index sur [bornes[segment], bornes[segment + 1]), retourne (activés, désactivés)"""
+        if self.segment is not None and segment == self.segment:
+            return (), ()
+        if self.segment is None or segment < self.segment:
+            # Premier appel ou retour en arrière : reconstruction depuis le début
+            self.segment = -1
+            self.active = set(self.initial)
+            incremental = False
+        else:
+            incremental = True
+
+        before = set(self.active) if incremental else None
+        while self.segment < segment:
+            self.segment += 1
+            self.active.difference_update(self.ends_at[self.segment])
+            self.active.update(self.starts_at[self.segment])
+
+        if not incremental:
+            return (), ()
+        return sorted(self.active - before), sorted(before - self.active)
+
+    def advance(self, timestamp):
+        """Avance jusqu'à un instant, retourne les contenus (activés, désactivés) depuis l'appel précédent"""
+        activated, deactivated = self.seek(bisect.bisect_right(self.bounds, timestamp) - 1)
+        return [self.contents[i] for i in activated], [self.contents[i] for i in deactivated]
+
+    def active_at(self, timestamp):
+        """Contenus actifs à un instant, dans l'ordre du manifeste"""
+        self.seek(bisect.bisect_right(self.bounds, timestamp) - 1)
+        return [self.contents[i] for i in sorted(self.active)]
+
+    def next_change(self, timestamp):
+        """Instant du prochain changement de l'ensemble actif (inf si aucun)"""
+        i = bisect.bisect_right(self.bounds, timestamp)
+        return self.bounds[i] if i < len(self.bounds) else float('inf')
+
+class CompiledValue:
+    """Résultat d'une compilation réutilisé jusqu'à son échéance ou jusqu'à une invalidation"""
+
+    def __init__(self, compile):
+        self.compile = compile  # fonction (instant) -> (valeur, instant d'échéance)
+        self.value = None
+        self.expiry = 0  # 0 : à recompiler au prochain appel
+        self.generation = 0
+
+    def invalidate(self):
+        """Force la recompilation au prochain appel (peut être appelé depuis un autre thread)"""
+        self.generation += 1
+        self.expiry = 0
+
+    def get(self, now):
+        """Valeur à un instant : une simple comparaison tant que l'échéance n'est pas atteinte"""
+        if now < self.expiry:
+            return self.value
+        generation = self.generation
+        self.value, expiry = self.compile(now)
+        # Invalidation survenue pendant la compilation : recompiler au prochain appel
+        self.expiry = expiry if generation == self.generation else 0
+        return self.value
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Services d'arrière-plan de l'affichage dynamique JUNIA
+Appels regroupés et tâches périodiques (sans pygame ni réseau, testable isolément)
+"""
+
+from threading import Thread, Event, Lock
+
+# ==================== APPELS REGROUPÉS ====================
+
+class SingleFlight:
+    """Appels simultanés d'une même opération regroupés : un seul s'exécute, tous partagent son résultat"""
+
+    def __init__(self):
+        self.lock = Lock()
+        self.calls = {}  # clé -> appel en cours {'done', 'result', 'error'}
+
+    def do(self, key, function, *args):
+        """Exécute function(*args), ou attend l'appel déjà en cours pour la même clé"""
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = self.calls[key] = {'done': Event(), 'result': None, 'error': None}
+
+        if not leader:
+            call['done'].wait()
+            if call['error'] is not None:
+                raise call['error']
+            return call['result']
+
+        try:
+            call['result'] = function(*args)
+        except Exception as e:
+            call['error'] = e
+            raise
+        finally:
+            # Retrait avant le réveil : un appel arrivant ensuite relance l'opération
+            with self.lock:
+                del self.calls[key]
+            call['done'].set()
+        return call['result']
+
+# ==================== TÂCHES PÉRIODIQUES ====================
+
+class BackgroundService:
+    """Tâche périodique dans un thread dédié, relançable à la demande sans bloquer l'appelant"""
+
+    def __init__(self, name, task, interval):
+        self.name = name
+        self.task = task
+        self.interval = interval
+        self.wakeup = Event()
+        self.lock = Lock()
+        self.requested = False
+        self.busy = False
+        self.thread = None
+        self.running = False
+
+    def start(self, immediate=True):
+        """Démarre le thread (première exécution immédiate ou après un intervalle)"""
+        self.running = True
+        if immediate:
+            self.wakeup.set()
+        self.thread = Thread(target=self.loop, daemon=True)
+        self.thread.start()
+
+    def request(self):
+        """Demande une exécution ; False si une exécution est déjà en cours ou demandée"""
+        with self.lock:
+            if self.busy or self.requested:
+                return False
+            self.requested = True
+        self.wakeup.set()
+        return True
+
+    def active(self):
+        """Exécution en cours ou demandée"""
+        return self.busy or self.requested
+
+    def loop(self):
+        while self.running:
+            self.wakeup.wait(self.interval)
+            self.wakeup.clear()
+            if not self.running:
+                break
+            with self.lock:
+                self.busy = True
+                self.requested = False
+            try:
+                self.task()
+            except Exception as e:
+                print(f"❌ Erreur {self.name}: {e}")
+            finally:
+                with self.lock:
+                    self.busy = False
+
+    def stop(self):
+        self.running = False
+        self.wakeup.set()
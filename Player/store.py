@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Stockage local des contenus de l'affichage dynamique JUNIA
+Fichiers adressés par md5, vérification en arrière-plan, quota disque (sans pygame, testable isolément)
+"""
+
+import os
+import time
+import queue
+from threading import Thread, Lock
+from datetime import datetime, timedelta
+
+import media_tools
+from downloader import load_json, save_json, fsync_dir, file_md5
+from schedule import parse_date
+
+# Arborescence sous le dossier des téléchargements
+STORE_DIR = "store"  # Fichiers nommés par leur md5
+INCOMING_DIR = "incoming"  # Téléchargements en attente de vérification
+MANIFEST_NAME = "manifest.json"  # Nom du contenu -> md5
+PLAYED_NAME = "played.json"  # Dernière diffusion de chaque fichier
+
+QUOTA_BYTES = 8 * 1024 ** 3  # Quota (fichiers, renditions et téléchargements partiels)
+PROTECT_HOURS = 24  # Les contenus diffusés dans les N prochaines heures ne sont jamais supprimés
+GC_BATCH = 20  # Suppressions maximum par passe (une passe par synchronisation)
+TMP_MAX_AGE = 3600  # Fichier .tmp non modifié depuis N secondes : écriture interrompue, supprimé
+
+# ==================== STOCKAGE ADRESSÉ PAR CONTENU ====================
+
+class ContentStore:
+    """Stockage adressé par contenu : un fichier par md5, manifeste nom -> md5"""
+
+    def __init__(self, folder, on_ready, on_change):
+        self.folder = folder  # Ancienne arborescence : fichiers nommés comme les contenus
+        self.store_folder = os.path.join(folder, STORE_DIR)
+        self.manifest_file = os.path.join(folder, MANIFEST_NAME)
+        self.on_ready = on_ready  # fonction (contenu, chemin) appelée une fois le fichier vérifié
+        self.on_change = on_change  # fonction appelée quand le manifeste change
+        self.lock = Lock()  # Manifeste, fichiers en vérification et démarrage du thread
+        self.entries = load_json(self.manifest_file) or {}
+        self.verify_queue = queue.Queue()
+        self.pending = set()
+        self.verify_thread = None
+        self.running = True
+
+    def blob_path(self, digest, ext):
+        """Chemin du fichier stocké pour une empreinte"""
+        return os.path.join(self.store_folder, digest + ext)
+
+    @staticmethod
+    def extension(name):
+        """Extension conservée (détection du format par OpenCV et pygame)"""
+        return os.path.splitext(name)[1].lower()
+
+    def entry(self, name):
+        """Entrée du manifeste dont le fichier est présent, ou None"""
+        with self.lock:
+            entry = self.entries.get(name)
+        if entry and os.path.exists(self.blob_path(entry['md5'], entry['ext'])):
+            return entry
+        return None
+
+    def path_for(self, name):
+        """Chemin local jouable d'un contenu (None si absent)"""
+        entry = self.entry(name)
+        if entry:
+            return self.blob_path(entry['md5'], entry['ext'])
+        # Ancien emplacement (downloads/<nom>) en attente d'intégration au stockage
+        legacy = os.path.join(self.folder, name)
+        return legacy if os.path.isfile(legacy) else None
+
+    def status(self, content):
+        """État local : 'ok', 'pending', 'adopt', 'revalidate' ou 'fetch'"""
+        name = content['name']
+        md5 = (content.get('md5') or '').lower()
+        with self.lock:
+            if name in self.pending:
+                return 'pending'
+
+        entry = self.entry(name)
+        if md5:
+            # Empreinte fournie par le serveur : comparaison sans aucune requête
+            if entry and entry['md5'] == md5:
+                return 'ok'
+            if os.path.exists(self.blob_path(md5, self.extension(name))):
+                self.record(name, md5, content['url'], {})
+                print(f"🔗 {name} : contenu identique déjà stocké, aucun téléchargement")
+                return 'ok'
+        elif entry:
+            # Pas d'empreinte : requête conditionnelle si le serveur a fourni des validateurs
+            return 'revalidate' if entry.get('etag') or entry.get('last_modified') else 'ok'
+
+        if os.path.isfile(os.path.join(self.folder, name)):
+            return 'adopt'
+        return 'fetch'
+
+    def conditional_headers(self, content):
+        """En-têtes If-None-Match / If-Modified-Since d'un contenu déjà stocké"""
+        # Empreinte fournie par le serveur : la comparaison est déjà faite, pas de requête conditionnelle
+        entry = None if content.get('md5') else self.entry(content['name'])
+        headers = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def record(self, name, digest, url, validators):
+        """Associe un nom à une empreinte et enregistre le manifeste"""
+        with self.lock:
+            self.entries[name] = {
+                'md5': digest,
+                'ext': self.extension(name),
+                'url': url,
+                'etag': validators.get('etag'),
+                'last_modified': validators.get('last_modified'),
+            }
+            save_json(self.manifest_file, self.entries)
+        self.on_change()
+
+    def forget_missing(self):
+        """Retire du manifeste les noms dont le fichier a été supprimé"""
+        with self.lock:
+            missing = [name for name, entry in self.entries.items()
+                       if not os.path.exists(self.blob_path(entry['md5'], entry['ext']))]
+            for name in missing:
+                del self.entries[name]
+            if missing:
+                save_json(self.manifest_file, self.entries)
+        if missing:
+            self.on_change()
+
+    def submit(self, content, path, validators):
+        """Confie un fichier reçu au thread de vérification"""
+        with self.lock:
+            self.pending.add(content['name'])
+            self.verify_queue.put((content, path, validators))
+            # Appelé depuis plusieurs threads de téléchargement : un seul thread de vérification
+            if self.verify_thread is None:
+                self.verify_thread = Thread(target=self.verify_loop, daemon=True)
+                self.verify_thread.start()
+
+    def verify_loop(self):
+        """Calcule une seule fois l'empreinte de chaque fichier reçu puis le range dans le stockage"""
+        while self.running:
+            try:
+                content, path, validators = self.verify_queue.get(timeout=1)
+            except queue.Empty:
+                continue
+
+            name = content['name']
+            try:
+                digest = file_md5(path)
+                expected = (content.get('md5') or '').lower()
+                if expected and digest != expected:
+                    os.remove(path)
+                    print(f"❌ Empreinte invalide pour {name} (md5 {digest}, attendu {expected}) : fichier rejeté")
+                    continue
+
+                blob = self.blob_path(digest, self.extension(name))
+                if os.path.exists(blob):
+                    os.remove(path)  # Doublon : contenu déjà stocké sous un autre nom
+                else:
+                    os.replace(path, blob)
+                    fsync_dir(self.store_folder)
+                self.record(name, digest, content.get('url'), validators)
+                print(f"🔐 Vérifié: {name} (md5 {digest[:8]})")
+                self.on_ready(content, blob)
+            except Exception as e:
+                print(f"❌ Erreur vérification {name}: {e}")
+            finally:
+                with self.lock:
+                    self.pending.discard(name)
+
+# ==================== QUOTA DISQUE ====================
+
+class StorageManager:
+    """Quota du dossier downloads/ : éviction incrémentale des fichiers inutiles, les moins récemment diffusés d'abord"""
+
+    def __init__(self, store, quota=QUOTA_BYTES, protect_hours=PROTECT_HOURS, batch=GC_BATCH,
+                 tmp_max_age=TMP_MAX_AGE):
+        self.store = store
+        self.quota = quota
+        self.protect_hours = protect_hours  # Contenus diffusés dans les N prochaines heures jamais supprimés
+        self.batch = batch  # Suppressions maximum par passe
+        self.tmp_max_age = tmp_max_age
+        self.incoming_folder = os.path.join(store.folder, INCOMING_DIR)
+        self.played_file = os.path.join(store.folder, PLAYED_NAME)
+        # Écrit par la boucle d'affichage, lu et purgé par le thread de synchronisation
+        self.played_lock = Lock()
+        self.played = load_json(self.played_file) or {}
+        self.played_dirty = False
+        self.over_quota = False
+
+    def mark_played(self, filepath):
+        """Note l'heure de diffusion d'un fichier (original ou rendition)"""
+        with self.played_lock:
+            self.played[os.path.basename(filepath)] = time.time()
+            self.played_dirty = True
+
+    def scan(self):
+        """Fichiers de downloads/ regroupés par original (renditions, partiels et fichiers .tmp inclus)"""
+        with self.played_lock:
+            played = dict(self.played)
+        now = time.time()
+        units = {}
+        for folder in (self.store.folder, self.store.store_folder, self.incoming_folder):
+            try:
+                entries = [entry for entry in os.scandir(folder) if entry.is_file()]
+            except OSError:
+                continue
+            names = {entry.name for entry in entries}
+            for entry in entries:
+                if entry.path in (self.store.manifest_file, self.played_file):
+                    continue  # Fichier d'état
+                stat = entry.stat()
+                if entry.name.endswith(".tmp"):
+                    # Écriture (JSON, rendition, transcodage) : comptée, jamais évincée tant qu'elle avance ;
+                    # abandonnée (coupure, arrêt) au-delà de TMP_MAX_AGE
+                    kind = 'garbage' if now - stat.st_mtime > self.tmp_max_age else 'writing'
+                    units[entry.path] = {'files': [entry.path], 'size': stat.st_size, 'played': 0.0, 'kind': kind}
+                    continue
+                source = media_tools.rendition_source(entry.name)
+                # Rendition dont l'original n'est plus là (supprimé, ou intégré au stockage) : inutilisable
+                orphan = source is not None and source not in names
+                if source is None or orphan:
+                    source = entry.name
+                for suffix in (".part.json", ".part"):
+                    if source.endswith(suffix):
+                        source = source[:-len(suffix)]
+                        break
+                unit = units.setdefault(os.path.join(folder, source),
+                                        {'files': [], 'size': 0, 'played': 0.0, 'kind': None})
+                if orphan:
+                    unit['kind'] = 'garbage'
+                unit['files'].append(entry.path)
+                unit['size'] += stat.st_size
+                unit['played'] = max(unit['played'], played.get(entry.name, 0.0))
+        return units
+
+    def local_paths(self, name):
+        """Emplacements possibles d'un contenu (stockage, arrivée, ancienne arborescence)"""
+        paths = {os.path.join(self.incoming_folder, name), os.path.join(self.store.folder, name)}
+        path = self.store.path_for(name)
+        if path:
+            paths.add(path)
+        return paths
+
+    def deferred(self, content, now=None):
+        """Vrai si le téléchargement d'un contenu lointain est reporté faute de place"""
+        start = parse_date(content.get('start_date'))
+        now = now or datetime.now()
+        return self.over_quota and start is not None and start > now + timedelta(hours=self.protect_hours)
+
+    def collect(self, contents):
+        """Passe de ramassage : au plus batch suppressions, pour ne jamais bloquer"""
+        now = datetime.now()
+        horizon = now + timedelta(hours=self.protect_hours)
+
+        # Fichiers des contenus en cours ou diffusés dans les N prochaines heures : intouchables
+        protected, later = set(), {}
+        for content in contents:
+            start = parse_date(content.get('start_date'))
+            end = parse_date(content.get('end_date'))
+            if end is not None and end < now:
+                continue  # Expiré : évictable
+            paths = self.local_paths(content['name'])
+            if start is not None and start > horizon:
+                for path in paths:
+                    later[path] = max(later.get(path, start), start)
+            else:
+                protected.update(paths)
+
+        units = self.scan()
+        usage = sum(unit['size'] for unit in units.values())
+
+        # Écritures abandonnées et renditions orphelines : supprimées même sous le quota ;
+        # puis les contenus retirés du serveur ou expirés, les moins récemment diffusés d'abord ;
+        # puis, si cela ne suffit pas, les contenus programmés au-delà de la fenêtre (les plus lointains d'abord)
+        evictable = {path: unit for path, unit in units.items()
+                     if path not in protected and unit['kind'] != 'writing'}
+        garbage = {path for path, unit in evictable.items() if unit['kind'] == 'garbage' and path not in later}
+        unused = sorted((unit['played'], path) for path, unit in evictable.items()
+                        if path not in later and unit['kind'] is None)
+        distant = sorted(((later[path], path) for path in evictable if path in later), reverse=True)
+        candidates = [path for _, path in unused] + [path for _, path in distant]
+
+        evicted = 0
+        for path in sorted(garbage) + candidates:
+            if evicted >= self.batch or (usage <= self.quota and path not in garbage):
+                break
+            for filepath in units[path]['files']:
+                try:
+                    os.remove(filepath)
+                except OSError as e:
+                    print(f"⚠️  Suppression impossible {filepath}: {e}")
+                    continue
+                with self.played_lock:
+                    self.played.pop(os.path.basename(filepath), None)
+                    self.played_dirty = True
+            usage -= units[path]['size']
+            evicted += 1
+            print(f"🧹 Supprimé: {os.path.basename(path)} ({units[path]['size'] / 1e6:.1f} Mo)")
+
+        if evicted:
+            self.store.forget_missing()
+        self.over_quota = usage > self.quota
+        if self.over_quota and evicted < self.batch:
+            print(f"⚠️  Quota dépassé ({usage / 1e9:.2f}/{self.quota / 1e9:.2f} Go) : contenus protégés uniquement")
+        self.save_played()
+        return evicted
+
+    def save_played(self):
+        """Enregistre les heures de diffusion si elles ont changé (copie prise sous le verrou)"""
+        with self.played_lock:
+            if not self.played_dirty:
+                return
+            played = dict(self.played)
+            self.played_dirty = False
+        save_json(self.played_file, played)
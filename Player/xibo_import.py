@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Import d'un lecteur Xibo (schedule.xml + cacheFile.xml)
+Produit la liste de contenus (planification) et pré-remplit le stockage local
+avec les fichiers déjà présents, sans retéléchargement ni recalcul d'empreinte
+
+Usage :
+    python xibo_import.py --xibo ~/snap/xibo-player/common --library ~/xibo-library
+    python xibo_import.py --xibo ../affichageDynamique/chris/snap/xibo-player/common --catalog xibo_contents.json
+"""
+
+import os
+import re
+import sys
+import json
+import shutil
+import argparse
+import xml.etree.ElementTree as ET
+from datetime import datetime
+
+# Arborescence du stockage local (voir ContentStore dans store.py)
+DOWNLOADS_FOLDER = "downloads"
+STORE_SUBFOLDER = "store"
+MANIFEST_NAME = "manifest.json"
+
+MEDIA_DURATION_DEFAULT = 20
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mov", ".mkv", ".webm")
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".gif", ".webp")
+
+# Dates Xibo : "2025-Sep-24 20:00:00" (mois anglais, indépendant de la locale)
+MONTHS = {m: i + 1 for i, m in enumerate(
+    ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"])}
+DATE_PATTERN = re.compile(r"^(\d{4})-([A-Za-z]{3})-(\d{1,2}) (\d{1,2}):(\d{2}):(\d{2})$")
+
+# cacheFile.xml n'est pas du XML valide (plusieurs racines, balises commençant par un chiffre)
+CACHE_ENTRY_PATTERN = re.compile(r"<([^<>/\s]+)>\s*<md5>\s*([0-9a-fA-F]{32})\s*</md5>(.*?)</\1>", re.S)
+VALID_PATTERN = re.compile(r"<valid>\s*(true|false)\s*</valid>")
+
+# ==================== LECTURE XIBO ====================
+
+def parse_xibo_date(value):
+    """Date Xibo en datetime, ou None"""
+    match = DATE_PATTERN.match((value or "").strip())
+    if not match or match.group(2).title() not in MONTHS:
+        return None
+    year, month, day, hour, minute, second = match.groups()
+    return datetime(int(year), MONTHS[month.title()], int(day), int(hour), int(minute), int(second))
+
+def read_cache_file(path):
+    """Empreintes de cacheFile.xml : {nom: md5} pour les fichiers valides"""
+    with open(path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    hashes = {}
+    for name, md5, rest in CACHE_ENTRY_PATTERN.findall(text):
+        valid = VALID_PATTERN.search(rest)
+        if valid and valid.group(1) == "true":
+            hashes[name] = md5.lower()
+    return hashes
+
+def media_type(name):
+    """'image', 'video' ou None (fichiers techniques : js, polices, html, xlf)"""
+    ext = os.path.splitext(name)[1].lower()
+    if ext in VIDEO_EXTENSIONS:
+        return 'video'
+    if ext in IMAGE_EXTENSIONS:
+        return 'image'
+    return None
+
+def layout_durations(library, layout_file):
+    """Durées des médias d'une mise en page Xibo (<n>.xlf), si le fichier est disponible"""
+    durations = {}
+    path = os.path.join(library, f"{layout_file}.xlf") if library else None
+    if not path or not os.path.exists(path):
+        return durations
+    try:
+        for media in ET.parse(path).getroot().iter('media'):
+            uri = media.findtext('options/uri')
+            if uri and media.get('duration', '').isdigit() and int(media.get('duration')) > 0:
+                durations[uri] = int(media.get('duration'))
+    except ET.ParseError as e:
+        print(f"⚠️  Mise en page illisible {path}: {e}")
+    return durations
+
+def merge_windows(windows):
+    """Union des fenêtres (début, fin) qui se chevauchent ou se touchent (None : non bornée)"""
+    merged = []
+    for start, end in sorted(windows, key=lambda w: w[0] or datetime.min):
+        if merged and (merged[-1][1] is None or start is None or start <= merged[-1][1]):
+            last_start, last_end = merged[-1]
+            merged[-1] = (last_start, None if last_end is None or end is None else max(last_end, end))
+        else:
+            merged.append((start, end))
+    return merged
+
+def read_schedule(path, library=None):
+    """Contenus de schedule.xml : un contenu par média dépendant, fenêtres réunies par fichier"""
+    root = ET.parse(path).getroot()
+    contents = {}
+
+    layouts = [(layout, False) for layout in root.findall('layout')]
+    layouts += [(layout, True) for layout in root.findall('default')]
+    for layout, is_default in layouts:
+        durations = layout_durations(library, layout.get('file'))
+        start = None if is_default else parse_xibo_date(layout.get('fromdt'))
+        end = None if is_default else parse_xibo_date(layout.get('todt'))
+        # Priorité Xibo : 0 = normale, au-dessus = prioritaire
+        xibo_priority = int(layout.get('priority') or 0)
+        priority = min(3, 2 + xibo_priority)
+
+        for file_node in layout.findall('dependents/file'):
+            name = (file_node.text or "").strip()
+            kind = media_type(name)
+            if not kind:
+                continue
+            content = contents.get(name)
+            if content is None:
+                contents[name] = {
+                    'name': name,
+                    'type': kind,
+                    'duration': durations.get(name, MEDIA_DURATION_DEFAULT),
+                    'priority': priority,
+                    'windows': [],
+                    'default': False,
+                }
+                content = contents[name]
+
+            # Mise en page par défaut : diffusé en permanence, quelles que soient les autres planifications
+            content['default'] = content['default'] or is_default
+            content['windows'].append((start, end))
+            content['priority'] = max(content['priority'], priority)
+
+    catalog = []
+    for content in contents.values():
+        item = {k: content[k] for k in ('name', 'type', 'duration', 'priority')}
+        windows = [(None, None)] if content['default'] else merge_windows(content['windows'])
+        if len(windows) > 1:
+            # Un contenu n'a qu'une fenêtre (start_date, end_date) et son nom est celui du fichier servi :
+            # le diffuser sur la fenêtre englobante le ferait passer entre les planifications
+            spans = ", ".join(f"{start or '…'} → {end or '…'}" for start, end in windows)
+            print(f"❌ {content['name']} : fenêtres disjointes ({spans}), non importé")
+            continue
+        start, end = windows[0]
+        if start:
+            item['start_date'] = start.isoformat()
+        if end:
+            item['end_date'] = end.isoformat()
+        catalog.append(item)
+    return catalog
+
+# ==================== STOCKAGE LOCAL ====================
+
+def load_manifest(path):
+    """Manifeste local (nom -> md5), vide si absent"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_json(path, data, indent=None):
+    """Écrit un fichier JSON de manière atomique"""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=indent)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+def place_blob(src, dst):
+    """Lien physique (aucune copie) ou, à défaut, copie atomique"""
+    try:
+        os.link(src, dst)
+    except OSError:
+        tmp_path = dst + ".tmp"
+        shutil.copy2(src, tmp_path)
+        os.replace(tmp_path, dst)
+
+def import_store(catalog, hashes, library, downloads):
+    """Range les fichiers Xibo déjà présents dans le stockage, empreintes reprises de cacheFile.xml"""
+    store = os.path.join(downloads, STORE_SUBFOLDER)
+    manifest_path = os.path.join(downloads, MANIFEST_NAME)
+    os.makedirs(store, exist_ok=True)
+    manifest = load_manifest(manifest_path)
+
+    imported, missing = 0, 0
+    for content in catalog:
+        name = content['name']
+        md5 = hashes.get(name)
+        src = os.path.join(library, name) if library else None
+        if not md5 or not src or not os.path.isfile(src):
+            missing += 1
+            continue
+        ext = os.path.splitext(name)[1].lower()
+        blob = os.path.join(store, md5 + ext)
+        if not os.path.exists(blob):
+            place_blob(src, blob)
+        manifest[name] = {'md5': md5, 'ext': ext, 'url': None, 'etag': None, 'last_modified': None}
+        imported += 1
+
+    save_json(manifest_path, manifest)
+    return imported, missing
+
+# ==================== POINT D'ENTRÉE ====================
+
+def main():
+    parser = argparse.ArgumentParser(description="Import d'un lecteur Xibo")
+    parser.add_argument("--xibo", required=True, help="Dossier contenant schedule.xml et cacheFile.xml")
+    parser.add_argument("--library", help="Bibliothèque média Xibo (fichiers 26.jpg, 6.xlf...)")
+    parser.add_argument("--downloads", default=DOWNLOADS_FOLDER, help="Dossier downloads/ du lecteur")
+    parser.add_argument("--catalog", default="xibo_contents.json",
+                        help="Liste de contenus produite (format /api/contents, catalogue du serveur de référence)")
+    args = parser.parse_args()
+
+    schedule_path = os.path.join(args.xibo, "schedule.xml")
+    cache_path = os.path.join(args.xibo, "cacheFile.xml")
+    if not os.path.exists(schedule_path):
+        parser.error(f"schedule.xml introuvable dans {args.xibo}")
+
+    catalog = read_schedule(schedule_path, args.library)
+    hashes = read_cache_file(cache_path) if os.path.exists(cache_path) else {}
+    for content in catalog:
+        if content['name'] in hashes:
+            content['md5'] = hashes[content['name']]
+    save_json(args.catalog, catalog, indent=2)
+    print(f"📋 {len(catalog)} contenus importés de schedule.xml -> {args.catalog}")
+
+    imported, missing = import_store(catalog, hashes, args.library, args.downloads)
+    print(f"📦 {imported} fichiers rangés dans le stockage sans téléchargement, "
+          f"{missing} à télécharger à la première synchronisation")
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Serveur de contenus de référence - Affichage Dynamique JUNIA
+Liste des contenus différentielle (versions) et fichiers servis avec ETag et reprise (Range)
+
+Usage :
+    python content_server.py --media medias/
+    python content_server.py --media medias/ --catalog contents.json --port 8090
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import hashlib
+import argparse
+from threading import Lock
+from email.utils import formatdate, parsedate_to_datetime
+from urllib.parse import urlparse, parse_qs, quote, unquote
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# ==================== CONFIGURATION ====================
+
+DEFAULT_PORT = 8090
+SCAN_INTERVAL = 5  # Relecture du dossier et du catalogue au plus toutes les N secondes
+HISTORY_SIZE = 1000  # Modifications conservées pour les réponses différentielles
+CHUNK_SIZE = 256 * 1024
+
+# Type deviné par extension quand le catalogue ne le précise pas
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mov", ".mkv", ".webm")
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".gif", ".webp")
+
+# ==================== CATALOGUE ====================
+
+def file_md5(path):
+    """Empreinte md5 d'un fichier, lu par blocs"""
+    digest = hashlib.md5()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+class Catalog:
+    """Contenus publiés, numérotés par version avec historique des modifications"""
+
+    def __init__(self, media, catalog_path=None, history=HISTORY_SIZE):
+        self.media = media
+        self.catalog_path = catalog_path
+        self.history = history
+        self.lock = Lock()  # Protège l'état publié (version, contenus) ; jamais tenu pendant un calcul d'empreinte
+        self.refresh_lock = Lock()  # Une seule relecture à la fois
+        # Instance du serveur : les numéros de version repartent de 0 à chaque démarrage
+        self.epoch = os.urandom(4).hex()
+        self.version = 0
+        self.floor = 0  # Plus ancienne version à partir de laquelle un différentiel est possible
+        self.entries = {}  # nom -> contenu publié
+        self.order = []  # Ordre du catalogue
+        self.created = {}  # nom -> version d'apparition
+        self.changes = []  # (version, nom) dans l'ordre
+        self.hashes = {}  # nom -> (taille, mtime, md5), utilisé seulement sous refresh_lock
+        self.signature = None
+        self.last_scan = 0
+
+    def scan(self):
+        """Signature du dossier média et du catalogue (détection de modification sans lecture)"""
+        files = {}
+        for entry in os.scandir(self.media):
+            if entry.is_file() and not entry.name.startswith('.'):
+                stat = entry.stat()
+                files[entry.name] = (stat.st_size, stat.st_mtime_ns)
+        catalog_mtime = None
+        if self.catalog_path and os.path.exists(self.catalog_path):
+            catalog_mtime = os.stat(self.catalog_path).st_mtime_ns
+        return files, catalog_mtime
+
+    def describe(self, files):
+        """Contenus publiés d'après le catalogue (ou tous les fichiers du dossier)"""
+        if self.catalog_path and os.path.exists(self.catalog_path):
+            with open(self.catalog_path, 'r', encoding='utf-8') as f:
+                items = [dict(item) for item in json.load(f)]
+        else:
+            items = [{'name': name} for name in sorted(files)]
+
+        described = []
+        for item in items:
+            name = item.get('name')
+            if name not in files:
+                continue  # Fichier absent : non publié
+            size, mtime = files[name]
+            cached = self.hashes.get(name)
+            if not cached or cached[:2] != (size, mtime):
+                cached = (size, mtime, file_md5(os.path.join(self.media, name)))
+                self.hashes[name] = cached
+            item['md5'] = cached[2]
+            item['size'] = size
+            if 'type' not in item:
+                ext = os.path.splitext(name)[1].lower()
+                item['type'] = 'video' if ext in VIDEO_EXTENSIONS else 'image'
+            described.append(item)
+        return described
+
+    def refresh(self, force=False):
+        """Relit le dossier et le catalogue ; une nouvelle version par lot de modifications"""
+        # Relecture déjà en cours : les requêtes servent la version publiée sans attendre
+        if not self.refresh_lock.acquire(blocking=force):
+            return
+        try:
+            now = time.time()
+            if not force and now - self.last_scan < SCAN_INTERVAL:
+                return
+            self.last_scan = now
+
+            signature = self.scan()
+            if signature == self.signature:
+                return
+            self.signature = signature
+
+            # Empreintes des fichiers nouveaux ou modifiés calculées hors du verrou des requêtes
+            described = self.describe(signature[0])
+            self.publish(described)
+        finally:
+            self.refresh_lock.release()
+
+    def publish(self, described):
+        """Remplace les contenus publiés (sous le verrou, sans lecture de fichier)"""
+        new_entries = {item['name']: item for item in described}
+        new_order = [item['name'] for item in described]
+        with self.lock:
+            modified = [name for name, item in new_entries.items() if self.entries.get(name) != item]
+            removed = [name for name in self.entries if name not in new_entries]
+            # Ordre qu'obtient un client en appliquant le différentiel (nouveaux contenus en fin)
+            expected = [name for name in self.order if name in new_entries]
+            expected += [name for name in new_order if name not in self.entries]
+            reordered = new_order != expected
+            if not modified and not removed and not reordered:
+                self.order = new_order
+                return
+
+            self.version += 1
+            for name in modified:
+                if name not in self.entries:
+                    self.created[name] = self.version
+                self.changes.append((self.version, name))
+            for name in removed:
+                self.created.pop(name, None)
+                self.changes.append((self.version, name))
+            self.entries = new_entries
+            self.order = new_order
+
+            # Historique borné : au-delà, les clients reçoivent la liste complète
+            if len(self.changes) > self.history:
+                dropped = self.changes[:len(self.changes) - self.history]
+                self.changes = self.changes[len(dropped):]
+                self.floor = dropped[-1][0]
+            if reordered:
+                # Un différentiel ne transmet pas l'ordre : liste complète pour tous les clients
+                self.floor = self.version
+            print(f"📋 Version {self.version} : {len(modified)} ajoutés/modifiés, {len(removed)} retirés"
+                  f"{', ordre modifié' if reordered else ''}")
+
+    def snapshot(self):
+        """Liste complète des contenus dans l'ordre du catalogue"""
+        with self.lock:
+            return self.version, [self.entries[name] for name in self.order]
+
+    def token(self, version):
+        """Version transmise aux clients (ETag, paramètre since) : instance et numéro"""
+        return f"{self.epoch}-{version}"
+
+    def parse_token(self, token):
+        """Numéro de version d'un jeton de cette instance, ou -1 (autre instance, jeton invalide)"""
+        epoch, _, version = token.rpartition('-')
+        if epoch != self.epoch or not version.isdigit():
+            return -1
+        return int(version)
+
+    def delta(self, since):
+        """Modifications depuis une version, ou None si l'historique ne remonte pas si loin"""
+        with self.lock:
+            if since < self.floor or since > self.version:
+                return None
+            names = []
+            for version, name in self.changes:
+                if version > since and name not in names:
+                    names.append(name)
+            added = [self.entries[n] for n in names if n in self.entries and self.created[n] > since]
+            changed = [self.entries[n] for n in names if n in self.entries and self.created[n] <= since]
+            removed = [n for n in names if n not in self.entries]
+            return {'version': self.version, 'full': False, 'added': added, 'changed': changed, 'removed': removed}
+
+# ==================== SERVEUR HTTP ====================
+
+RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+class ContentHandler(BaseHTTPRequestHandler):
+    """API /api/ping, /api/contents et fichiers /downloads/<nom>"""
+
+    catalog = None
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass  # Centaines d'écrans : pas de journal par requête
+
+    def base_url(self):
+        """URL du serveur telle que vue par le client"""
+        return f"http://{self.headers.get('Host') or '%s:%d' % self.server.server_address[:2]}"
+
+    def with_url(self, item):
+        """Contenu publié complété de son URL de téléchargement"""
+        return dict(item, url=f"{self.base_url()}/downloads/{quote(item['name'])}")
+
+    def send_json(self, data, status=200, etag=None):
+        body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        if etag:
+            self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_empty(self, status, headers=None):
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == '/api/ping':
+            self.send_json({'message': 'OK'})
+        elif url.path == '/api/contents':
+            self.send_contents(parse_qs(url.query))
+        elif url.path.startswith('/downloads/'):
+            self.send_file(unquote(url.path[len('/downloads/'):]))
+        else:
+            self.send_empty(404)
+
+    def send_contents(self, query):
+        """Liste des contenus : 304, différentiel, liste complète, ou tableau simple (anciens lecteurs)"""
+        self.catalog.refresh()
+        version, contents = self.catalog.snapshot()
+        token = self.catalog.token(version)
+        etag = f'"{token}"'
+
+        if 'since' not in query:
+            self.send_json([self.with_url(item) for item in contents], etag=etag)
+            return
+
+        if self.headers.get('If-None-Match') == etag:
+            self.send_empty(304, {'ETag': etag})
+            return
+
+        # Version d'une autre instance (serveur redémarré) : historique différent, liste complète
+        since = self.catalog.parse_token(query['since'][0])
+        delta = self.catalog.delta(since) if since > 0 else None
+        if delta is None:
+            self.send_json({'version': token, 'full': True,
+                            'contents': [self.with_url(item) for item in contents]}, etag=etag)
+            return
+
+        delta['version'] = self.catalog.token(delta['version'])
+        delta['added'] = [self.with_url(item) for item in delta['added']]
+        delta['changed'] = [self.with_url(item) for item in delta['changed']]
+        self.send_json(delta, etag=f'"{delta["version"]}"')
+
+    def send_file(self, name):
+        """Fichier publié avec ETag (md5), Last-Modified, If-None-Match et reprise (Range / If-Range)"""
+        self.catalog.refresh()
+        with self.catalog.lock:
+            item = self.catalog.entries.get(name)
+        if item is None or os.path.basename(name) != name:
+            self.send_empty(404)
+            return
+
+        path = os.path.join(self.catalog.media, name)
+        try:
+            f = open(path, 'rb')
+        except OSError:
+            self.send_empty(404)
+            return
+
+        with f:
+            stat = os.fstat(f.fileno())
+            size = stat.st_size
+            etag = f'"{item["md5"]}"'
+            last_modified = formatdate(stat.st_mtime, usegmt=True)
+            headers = {'ETag': etag, 'Last-Modified': last_modified, 'Accept-Ranges': 'bytes'}
+
+            if self.headers.get('If-None-Match') == etag:
+                self.send_empty(304, headers)
+                return
+
+            start, end = 0, size - 1
+            status = 200
+            requested = self.headers.get('Range')
+            if requested and self.range_applies(etag, stat.st_mtime):
+                match = RANGE_PATTERN.match(requested.strip())
+                if match and (match.group(1) or match.group(2)):
+                    if match.group(1):
+                        start = int(match.group(1))
+                        if match.group(2):
+                            end = min(int(match.group(2)), size - 1)
+                    else:
+                        start = max(0, size - int(match.group(2)))
+                    if start >= size or start > end:
+                        self.send_empty(416, {'Content-Range': f"bytes */{size}"})
+                        return
+                    status = 206
+                    headers['Content-Range'] = f"bytes {start}-{end}/{size}"
+
+            length = end - start + 1 if size else 0
+            self.send_response(status)
+            for key, value in headers.items():
+                self.send_header(key, value)
+            self.send_header('Content-Type', 'application/octet-stream')
+            self.send_header('Content-Length', str(length))
+            self.end_headers()
+
+            f.seek(start)
+            remaining = length
+            while remaining > 0:
+                block = f.read(min(CHUNK_SIZE, remaining))
+                if not block:
+                    break
+                self.wfile.write(block)
+                remaining -= len(block)
+
+    def range_applies(self, etag, mtime):
+        """If-Range : la plage n'est servie que si le fichier n'a pas changé"""
+        validator = self.headers.get('If-Range')
+        if not validator:
+            return True
+        if validator.startswith('"') or validator.startswith('W/'):
+            return validator == etag
+        try:
+            return int(parsedate_to_datetime(validator).timestamp()) >= int(mtime)
+        except (TypeError, ValueError):
+            return False
+
+# ==================== POINT D'ENTRÉE ====================
+
+def main():
+    parser = argparse.ArgumentParser(description="Serveur de contenus de référence")
+    parser.add_argument("--media", required=True, help="Dossier des fichiers publiés")
+    parser.add_argument("--catalog", help="Catalogue JSON (durée, priorité, dates) ; sinon tous les fichiers")
+    parser.add_argument("--host", default="0.0.0.0", help="Adresse d'écoute")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Port d'écoute")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.media):
+        parser.error(f"dossier introuvable : {args.media}")
+
+    ContentHandler.catalog = Catalog(args.media, args.catalog)
+    ContentHandler.catalog.refresh(force=True)
+
+    server = ThreadingHTTPServer((args.host, args.port), ContentHandler)
+    server.daemon_threads = True
+    print(f"🌐 Serveur de contenus sur http://{args.host}:{args.port} ({args.media})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Serveur arrêté")
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Modules du lecteur et du serveur importés comme dans leurs dossiers respectifs
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for folder in ("Player", "Server"):
+    sys.path.insert(0, os.path.join(ROOT, folder))
@@ -0,0 +1,113 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+from http.server import ThreadingHTTPServer
+
+import content_server
+
+
+def make_catalog(tmp_path, names):
+    media = tmp_path / "media"
+    media.mkdir(exist_ok=True)
+    for name in names:
+        (media / name).write_bytes(name.encode() * 100)
+    path = tmp_path / "contents.json"
+    path.write_text(json.dumps([{"name": name} for name in names]))
+    catalog = content_server.Catalog(str(media), str(path))
+    catalog.refresh(force=True)
+    return catalog, path
+
+
+def test_reorder_bumps_version_and_forces_full_list(tmp_path):
+    catalog, path = make_catalog(tmp_path, ["a.jpg", "b.jpg", "c.jpg"])
+    version, _ = catalog.snapshot()
+
+    path.write_text(json.dumps([{"name": "c.jpg"}, {"name": "a.jpg"}, {"name": "b.jpg"}]))
+    catalog.signature = None
+    catalog.refresh(force=True)
+
+    new_version, contents = catalog.snapshot()
+    assert new_version == version + 1
+    assert [item["name"] for item in contents] == ["c.jpg", "a.jpg", "b.jpg"]
+    assert catalog.delta(version) is None  # Liste complète
+    assert catalog.delta(new_version)["added"] == []
+
+
+def test_append_keeps_delta(tmp_path):
+    catalog, path = make_catalog(tmp_path, ["a.jpg", "b.jpg"])
+    version, _ = catalog.snapshot()
+    (tmp_path / "media" / "d.jpg").write_bytes(b"d" * 100)
+    path.write_text(json.dumps([{"name": "a.jpg"}, {"name": "b.jpg"}, {"name": "d.jpg"}]))
+    catalog.refresh(force=True)
+
+    delta = catalog.delta(version)
+    assert [item["name"] for item in delta["added"]] == ["d.jpg"]
+
+
+def test_requests_are_not_blocked_by_hashing(tmp_path, monkeypatch):
+    catalog, path = make_catalog(tmp_path, ["a.jpg"])
+    hashing = threading.Event()
+    release = threading.Event()
+    original = content_server.file_md5
+
+    def slow_md5(path):
+        hashing.set()
+        release.wait(5)
+        return original(path)
+
+    monkeypatch.setattr(content_server, "file_md5", slow_md5)
+    (tmp_path / "media" / "big.mp4").write_bytes(b"x" * 1000)
+    path.write_text(json.dumps([{"name": "a.jpg"}, {"name": "big.mp4"}]))
+    thread = threading.Thread(target=catalog.refresh, kwargs={"force": True})
+    thread.start()
+    assert hashing.wait(5)
+
+    # Pendant le calcul d'empreinte : la version publiée reste servie sans attente
+    catalog.refresh()
+    version, contents = catalog.snapshot()
+    assert [item["name"] for item in contents] == ["a.jpg"]
+    assert catalog.delta(version) is not None
+
+    release.set()
+    thread.join(5)
+    assert catalog.snapshot()[0] == version + 1
+
+
+def get_contents(catalog, since):
+    """Requête /api/contents?since= sur un serveur de référence lancé pour l'occasion"""
+    handler = type("Handler", (content_server.ContentHandler,), {"catalog": catalog})
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    try:
+        url = "http://127.0.0.1:%d/api/contents?since=%s" % (httpd.server_address[1], since)
+        request = urllib.request.Request(url, headers={"If-None-Match": '"%s"' % since})
+        try:
+            with urllib.request.urlopen(request, timeout=5) as response:
+                return response.status, json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            return e.code, None
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+
+
+def test_restarted_server_sends_full_list(tmp_path):
+    catalog, path = make_catalog(tmp_path, ["a.jpg", "b.jpg"])
+    status, data = get_contents(catalog, "0")
+    token = data["version"]
+    assert get_contents(catalog, token)[0] == 304
+
+    # Redémarrage : même numéro de version atteint avec un autre catalogue
+    (tmp_path / "media" / "c.jpg").write_bytes(b"c" * 100)
+    path.write_text(json.dumps([{"name": "a.jpg"}, {"name": "c.jpg"}]))
+    restarted = content_server.Catalog(catalog.media, str(path))
+    restarted.refresh(force=True)
+    assert restarted.version == catalog.version
+
+    status, data = get_contents(restarted, token)
+    assert status == 200
+    assert data["full"] is True
+    assert [item["name"] for item in data["contents"]] == ["a.jpg", "c.jpg"]
+    assert data["version"] != token
@@ -0,0 +1,84 @@
+import time
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("requests")
+
+from downloader import DownloadScheduler
+
+
+def job(name, host="h", priority=2, start=None):
+    content = {"name": name, "url": "http://%s/%s" % (host, name), "priority": priority,
+               "start_date": start.isoformat() if start else None}
+    return content, "/tmp/" + name
+
+
+def run_in_order(jobs, **options):
+    """Ordre de traitement avec un seul worker"""
+    order = []
+    scheduler = DownloadScheduler(lambda content, path: order.append(content["name"]) or True,
+                                  workers=1, **options)
+    assert scheduler.run(jobs) == len(jobs)
+    return order
+
+
+def test_priority_then_start_date_then_manifest_order():
+    soon = datetime.now() + timedelta(hours=1)
+    later = datetime.now() + timedelta(days=2)
+    jobs = [job("later", start=later), job("plain"), job("urgent", priority=4),
+            job("soon", start=soon), job("plain2")]
+    assert run_in_order(jobs) == ["urgent", "plain", "plain2", "soon", "later"]
+
+
+def test_first_planned_slot_overrides_start_date():
+    now = time.time()
+    slots = {"a": now + 3600, "b": now + 60}
+    jobs = [job("a"), job("b"), job("c", start=datetime.now() - timedelta(hours=1))]
+    # c n'est pas dans le plan mais a déjà commencé : attente nulle
+    assert run_in_order(jobs, first_slot=lambda c: slots.get(c["name"], float("inf"))) == ["c", "b", "a"]
+
+
+def test_ties_broken_by_position_in_cycle():
+    positions = {"a": 5, "b": 0, "c": 2}
+    jobs = [job("a"), job("b"), job("c"), job("d")]
+    assert run_in_order(jobs, position=lambda c: positions.get(c["name"], float("inf"))) == ["b", "c", "a", "d"]
+
+
+def test_per_host_limit_and_other_hosts_not_starved():
+    lock = threading.Lock()
+    active = {}
+    peak = {}
+    started = []
+
+    def download(content, path):
+        host = content["url"].split("/")[2]
+        with lock:
+            active[host] = active.get(host, 0) + 1
+            peak[host] = max(peak.get(host, 0), active[host])
+            started.append(content["name"])
+        time.sleep(0.05)
+        with lock:
+            active[host] -= 1
+        return True
+
+    jobs = [job("a%d" % i, host="a", priority=3) for i in range(6)] + [job("b0", host="b")]
+    scheduler = DownloadScheduler(download, workers=3, per_host=2)
+    assert scheduler.run(jobs) == 7
+    assert peak == {"a": 2, "b": 1}
+    # Serveur a saturé : le troisième worker prend le contenu moins prioritaire de b
+    assert "b0" in started[:3]
+    assert scheduler.progress == (7, 7)
+
+
+def test_failures_are_counted_and_do_not_stop_the_batch():
+    def download(content, path):
+        if content["name"] == "bad":
+            raise IOError("coupure")
+        return content["name"] != "unchanged"
+
+    scheduler = DownloadScheduler(download, workers=2)
+    assert scheduler.run([job("bad"), job("ok"), job("unchanged")]) == 1
+    assert scheduler.progress == (3, 3)
+    assert scheduler.run([]) == 0
@@ -0,0 +1,129 @@
+import os
+import hashlib
+import threading
+
+import pytest
+
+pytest.importorskip("requests")
+
+from http.server import ThreadingHTTPServer
+
+import content_server
+from downloader import download_file
+
+CHUNK = 1024
+
+
+class RecordingHandler(content_server.ContentHandler):
+    """Gestionnaire du serveur de référence qui note les en-têtes Range reçus"""
+
+    ranges = []
+
+    def do_GET(self):
+        self.ranges.append(self.headers.get('Range'))
+        super().do_GET()
+
+
+@pytest.fixture
+def server(tmp_path):
+    media = tmp_path / "media"
+    media.mkdir()
+    (media / "clip.mp4").write_bytes(os.urandom(20 * CHUNK))
+
+    catalog = content_server.Catalog(str(media))
+    catalog.refresh(force=True)
+    handler = type("Handler", (RecordingHandler,), {"catalog": catalog, "ranges": []})
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield {
+        "url": "http://127.0.0.1:%d/downloads/clip.mp4" % httpd.server_address[1],
+        "media": media,
+        "catalog": catalog,
+        "handler": handler,
+    }
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def stop_after(chunks):
+    """running() qui interrompt le transfert après quelques blocs"""
+    calls = []
+
+    def running():
+        calls.append(None)
+        return len(calls) <= chunks
+
+    return running
+
+
+def test_interrupted_transfer_resumes_with_range(server, tmp_path):
+    target = str(tmp_path / "clip.mp4")
+    with pytest.raises(IOError):
+        download_file(server["url"], target, chunk_size=CHUNK, running=stop_after(5))
+    assert not os.path.exists(target)
+    partial = os.path.getsize(target + ".part")
+    assert 0 < partial < 20 * CHUNK
+
+    meta = download_file(server["url"], target, chunk_size=CHUNK)
+    assert meta and meta["size"] == 20 * CHUNK
+    assert server["handler"].ranges[-1] == "bytes=%d-" % partial
+    assert open(target, "rb").read() == (server["media"] / "clip.mp4").read_bytes()
+    assert not os.path.exists(target + ".part")
+    assert not os.path.exists(target + ".part.json")
+
+
+def test_etag_change_discards_partial(server, tmp_path):
+    target = str(tmp_path / "clip.mp4")
+    with pytest.raises(IOError):
+        download_file(server["url"], target, chunk_size=CHUNK, running=stop_after(5))
+
+    # Nouvelle version publiée sous le même nom : If-Range ne correspond plus
+    (server["media"] / "clip.mp4").write_bytes(os.urandom(12 * CHUNK))
+    server["catalog"].refresh(force=True)
+
+    meta = download_file(server["url"], target, chunk_size=CHUNK)
+    assert meta and meta["size"] == 12 * CHUNK
+    assert open(target, "rb").read() == (server["media"] / "clip.mp4").read_bytes()
+
+
+def test_oversized_partial_gets_416_and_is_discarded(server, tmp_path):
+    target = str(tmp_path / "clip.mp4")
+    with pytest.raises(IOError):
+        download_file(server["url"], target, chunk_size=CHUNK, running=stop_after(5))
+    with open(target + ".part", "ab") as f:
+        f.write(os.urandom(30 * CHUNK))
+
+    assert download_file(server["url"], target, chunk_size=CHUNK) is False
+    assert not os.path.exists(target + ".part")
+    assert not os.path.exists(target + ".part.json")
+    assert not os.path.exists(target)
+
+
+def complete_partial(server, target):
+    """Partiel complet, comme après une coupure entre fsync et renommage"""
+    with pytest.raises(IOError):
+        download_file(server["url"], target, chunk_size=CHUNK, running=stop_after(5))
+    with open(target + ".part", "wb") as f:
+        f.write((server["media"] / "clip.mp4").read_bytes())
+
+
+def test_complete_partial_is_finalised_on_416(server, tmp_path):
+    target = str(tmp_path / "clip.mp4")
+    complete_partial(server, target)
+
+    assert download_file(server["url"], target, chunk_size=CHUNK)
+    assert server["handler"].ranges[-1] == "bytes=%d-" % (20 * CHUNK)
+    assert open(target, "rb").read() == (server["media"] / "clip.mp4").read_bytes()
+    assert not os.path.exists(target + ".part.json")
+
+
+def test_complete_partial_with_known_md5_needs_no_request(server, tmp_path):
+    target = str(tmp_path / "clip.mp4")
+    complete_partial(server, target)
+    md5 = hashlib.md5((server["media"] / "clip.mp4").read_bytes()).hexdigest()
+    requests_before = len(server["handler"].ranges)
+
+    assert download_file(server["url"], target, md5=md5, chunk_size=CHUNK)
+    assert len(server["handler"].ranges) == requests_before
+    assert os.path.exists(target)
@@ -0,0 +1,57 @@
+import struct
+
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+np = pytest.importorskip("numpy")
+
+import media_tools
+
+
+def exif_segment(orientation, order="<"):
+    """Segment APP1 minimal : IFD0 avec la seule étiquette Orientation"""
+    marker = b"II" if order == "<" else b"MM"
+    tiff = marker + struct.pack(order + "HI", 42, 8)
+    tiff += struct.pack(order + "H", 1) + struct.pack(order + "HHIHH", 0x0112, 3, 1, orientation, 0)
+    tiff += struct.pack(order + "I", 0)
+    data = b"Exif\x00\x00" + tiff
+    return b"\xff\xe1" + struct.pack(">H", len(data) + 2) + data
+
+
+def write_jpeg(path, size, orientation=None, order="<"):
+    w, h = size
+    ok, encoded = cv2.imencode(".jpg", np.zeros((h, w, 3), dtype=np.uint8))
+    data = encoded.tobytes()
+    if orientation is not None:
+        data = data[:2] + exif_segment(orientation, order) + data[2:]
+    path.write_bytes(data)
+    return str(path)
+
+
+@pytest.mark.parametrize("order", ["<", ">"])
+def test_jpeg_size_applies_exif_rotation(tmp_path, order):
+    path = write_jpeg(tmp_path / "portrait.jpg", (400, 300), orientation=6, order=order)
+    assert media_tools.jpeg_size(path) == (300, 400)
+    assert cv2.imread(path).shape[:2] == (400, 300)
+
+
+def test_jpeg_size_without_rotation(tmp_path):
+    assert media_tools.jpeg_size(write_jpeg(tmp_path / "a.jpg", (400, 300))) == (400, 300)
+    assert media_tools.jpeg_size(write_jpeg(tmp_path / "b.jpg", (400, 300), orientation=1)) == (400, 300)
+
+
+def test_make_renditions_decodes_once(tmp_path, monkeypatch):
+    path = write_jpeg(tmp_path / "photo.jpg", (640, 480))
+    calls = []
+    original = media_tools.decode_image
+    monkeypatch.setattr(media_tools, "decode_image", lambda *args: calls.append(args) or original(*args))
+
+    sizes = [(320, 180), (213, 180)]
+    written = media_tools.make_renditions(path, sizes)
+    assert len(written) == 2 and len(calls) == 1
+    for size in sizes:
+        assert media_tools.rendition_ready(path, size)
+        assert media_tools.load_rendition(path, size) is not None
+
+    assert media_tools.make_renditions(path, sizes) == []
+    assert len(calls) == 1
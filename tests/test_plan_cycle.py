@@ -0,0 +1,41 @@
+from collections import Counter
+
+from playlist import plan_cycle, Timeline
+
+API_PAGES = [("bus", 1, 1, None), ("weather", 1, 1, None), ("vlille", 1, 1, None)]
+
+
+def no_repeat(keys):
+    return all(a != b for a, b in zip(keys, keys[1:]))
+
+
+def test_weighted_item_is_interleaved_over_two_cycles():
+    plan = [key for key, _ in plan_cycle(API_PAGES + [("promo", 3, None, None)])]
+    assert Counter(plan) == {"bus": 1, "weather": 1, "vlille": 1, "promo": 3}
+    assert no_repeat(plan + plan)
+
+
+def test_priority_weights_never_repeat_across_wrap():
+    items = API_PAGES + [("a", 2, None, None), ("b", 2, None, None), ("c", 1, None, None)]
+    plan = [key for key, _ in plan_cycle(items)]
+    assert len(plan) == 8
+    assert no_repeat(plan + plan)
+
+
+def test_bounds_and_pass_numbers():
+    plan = plan_cycle([("a", 5, None, 2), ("b", 0, 1, None), ("c", 0, None, None)])
+    assert sorted(plan) == [("a", 0), ("a", 1), ("b", 0)]
+
+
+def test_plan_is_deterministic():
+    items = API_PAGES + [("x", 2, None, None)]
+    assert plan_cycle(items) == plan_cycle(list(items))
+
+
+def test_timeline_cycles_do_not_repeat_a_page():
+    members = [{"key": key, "duration": 10, "weight": weight, "min": low, "max": high}
+               for key, weight, low, high in API_PAGES + [("promo", 3, None, None)]]
+    slots = Timeline.fill(members, 0, 600)
+    keys = [key for _, _, key in slots]
+    assert len(keys) == 60
+    assert no_repeat(keys)
@@ -0,0 +1,100 @@
+from playlist import Playlist
+
+
+def make(keys):
+    playlist = Playlist()
+    playlist.sync([(key, key.upper()) for key in keys])
+    return playlist
+
+
+def test_advance_wraps_and_starts_at_first_page():
+    playlist = make(["a", "b", "c"])
+    assert playlist.current() is None
+    assert [playlist.advance() for _ in range(4)] == ["A", "B", "C", "A"]
+
+
+def test_insert_keeps_current_and_next():
+    playlist = make(["a", "b", "c"])
+    playlist.advance()
+    playlist.advance()  # b
+    playlist.insert("x", "X", 0)
+    assert playlist.current() == "B"
+    assert playlist.peek(1) == "C"
+    playlist.insert("y", "Y")  # En fin de liste
+    assert playlist.current() == "B"
+    assert [playlist.advance() for _ in range(3)] == ["C", "Y", "X"]
+
+
+def test_remove_current_page_moves_to_next():
+    playlist = make(["a", "b", "c"])
+    playlist.advance()
+    playlist.advance()  # b
+    assert playlist.remove("b")
+    assert playlist.current() is None
+    assert playlist.peek(1) == "C"
+    assert playlist.advance() == "C"
+
+
+def test_remove_before_cursor_keeps_current():
+    playlist = make(["a", "b", "c"])
+    playlist.advance()
+    playlist.advance()
+    playlist.advance()  # c
+    playlist.remove("a")
+    assert playlist.current() == "C"
+    assert playlist.advance() == "B"
+
+
+def test_remove_last_page_wraps():
+    playlist = make(["a", "b"])
+    playlist.advance()
+    playlist.advance()  # b
+    playlist.remove("b")
+    assert playlist.advance() == "A"
+    assert not playlist.remove("missing")
+
+
+def test_move_keeps_current_page():
+    playlist = make(["a", "b", "c", "d"])
+    playlist.advance()
+    playlist.advance()  # b
+    playlist.move("d", 0)
+    assert playlist.keys == ["d", "a", "b", "c"]
+    assert playlist.current() == "B"
+    assert playlist.advance() == "C"
+
+
+def test_sync_keeps_cursor_on_surviving_page():
+    playlist = make(["a", "b", "c"])
+    playlist.advance()
+    playlist.advance()  # b
+    playlist.sync([("x", "X"), ("b", "B2"), ("c", "C"), ("a", "A")])
+    assert playlist.keys == ["x", "b", "c", "a"]
+    assert playlist.current() == "B2"
+    assert [playlist.advance() for _ in range(3)] == ["C", "A", "X"]
+
+
+def test_sync_removing_current_page_continues_with_next():
+    playlist = make(["a", "b", "c"])
+    playlist.advance()
+    playlist.advance()  # b
+    playlist.sync([("a", "A"), ("c", "C")])
+    assert playlist.current() is None
+    assert playlist.advance() == "C"
+
+
+def test_cue_makes_page_next_without_skipping_current_display():
+    playlist = make(["a", "b", "c", "d"])
+    playlist.advance()  # a
+    assert playlist.cue("c")
+    assert playlist.peek(1) == "C"
+    assert playlist.advance() == "C"
+    assert playlist.advance() == "D"
+    assert not playlist.cue("missing")
+
+
+def test_empty_playlist():
+    playlist = Playlist()
+    assert playlist.advance() is None
+    assert playlist.peek(1) is None
+    assert len(playlist) == 0
@@ -0,0 +1,59 @@
+import time
+
+from profiler import Profiler
+
+
+def test_disabled_profiler_records_nothing():
+    profiler = Profiler()
+    with profiler.measure("render"):
+        pass
+    assert profiler.samples == {}
+    assert profiler.measure("render") is profiler.measure("flip")  # Même minuteur inactif
+
+
+def test_enabled_profiler_records_durations():
+    profiler = Profiler(enabled=True)
+    with profiler.measure("render"):
+        time.sleep(0.01)
+    with profiler.measure("render"):
+        pass
+    samples = list(profiler.samples["render"])
+    assert len(samples) == 2
+    assert samples[0] >= 0.01
+
+
+def test_exception_is_measured_and_propagated():
+    profiler = Profiler(enabled=True)
+    try:
+        with profiler.measure("download"):
+            raise IOError("coupure")
+    except IOError:
+        pass
+    assert len(profiler.samples["download"]) == 1
+
+
+def test_window_keeps_only_recent_samples():
+    profiler = Profiler(enabled=True, window=3)
+    for i in range(5):
+        profiler.record("flip", i / 1000)
+    assert list(profiler.samples["flip"]) == [0.002, 0.003, 0.004]
+
+
+def test_toggle_resets_samples(capsys):
+    profiler = Profiler(enabled=True)
+    profiler.record("flip", 0.001)
+    profiler.toggle()
+    assert not profiler.enabled
+    assert "flip" in profiler.samples  # Conservées pour le rapport
+    profiler.toggle()
+    assert profiler.samples == {}
+
+
+def test_report_percentiles(capsys):
+    profiler = Profiler(enabled=True)
+    for ms in range(1, 101):
+        profiler.record("render", ms / 1000)
+    profiler.report()
+    line = [l for l in capsys.readouterr().out.splitlines() if "render" in l][0]
+    n, p50, p95, p99, worst = line.split()[1:]
+    assert (n, p50, p95, p99, worst) == ("100", "51.0", "96.0", "100.0", "100.0")
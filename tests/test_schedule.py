@@ -0,0 +1,118 @@
+from datetime import datetime
+
+from schedule import parse_date, window, ScheduleIndex, CompiledValue
+
+
+def ts(hour, minute=0):
+    return datetime(2026, 1, 1, hour, minute).timestamp()
+
+
+def content(name, start=None, end=None):
+    return {"name": name,
+            "start_date": "2026-01-01T%s" % start if start else None,
+            "end_date": "2026-01-01T%s" % end if end else None}
+
+
+def names(contents):
+    return [c["name"] for c in contents]
+
+
+def test_parse_date_tolerates_missing_and_invalid_values():
+    assert parse_date(None) is None
+    assert parse_date("") is None
+    assert parse_date("demain") is None
+    assert parse_date("2026-01-01T10:00:00") == datetime(2026, 1, 1, 10)
+
+
+def test_window_end_is_exclusive_just_after_end_date():
+    start, end = window(content("a", "10:00:00", "11:00:00"))
+    assert start == ts(10)
+    assert ts(11) < end < ts(11) + 1
+    assert window(content("b")) == (None, None)
+
+
+def test_active_at_boundaries():
+    index = ScheduleIndex([
+        content("always"),
+        content("morning", "08:00:00", "12:00:00"),
+        content("noon", "12:00:00", "13:00:00"),
+        content("empty", "15:00:00", "14:00:00"),
+    ])
+    assert names(index.active_at(ts(7))) == ["always"]
+    assert names(index.active_at(ts(8))) == ["always", "morning"]
+    # end_date inclus : la fin s'applique strictement après
+    assert names(index.active_at(ts(12))) == ["always", "morning", "noon"]
+    assert names(index.active_at(ts(12) + 0.01)) == ["always", "noon"]
+    assert names(index.active_at(ts(14, 30))) == ["always"]
+
+
+def test_next_change_returns_following_boundary():
+    index = ScheduleIndex([content("a", "08:00:00", "09:00:00"), content("b")])
+    assert index.next_change(ts(7)) == ts(8)
+    assert index.next_change(ts(8)) == window(index.contents[0])[1]
+    assert index.next_change(ts(10)) == float("inf")
+    assert ScheduleIndex([content("b")]).next_change(ts(10)) == float("inf")
+
+
+def test_advance_reports_changes_once():
+    index = ScheduleIndex([content("a", "08:00:00", "09:00:00"), content("b", "08:30:00")])
+    assert index.advance(ts(7)) == ([], [])  # Premier appel : état initial, aucun événement
+    activated, deactivated = index.advance(ts(8, 45))
+    assert names(activated) == ["a", "b"] and deactivated == []
+    # Même segment : résultat mémorisé, aucun nouvel événement
+    assert index.advance(ts(8, 50)) == ([], [])
+    activated, deactivated = index.advance(ts(10))
+    assert activated == [] and names(deactivated) == ["a"]
+
+
+def test_going_back_in_time_rebuilds_active_set():
+    index = ScheduleIndex([content("a", "08:00:00", "09:00:00")])
+    assert names(index.active_at(ts(8, 30))) == ["a"]
+    assert names(index.active_at(ts(10))) == []
+    # Horloge reculée : reconstruction depuis le début, sans événement
+    assert index.advance(ts(8, 30)) == ([], [])
+    assert names(index.active_at(ts(8, 30))) == ["a"]
+
+
+class Compiler:
+    """compile() de test : compte les appels, échéance fixée par le test"""
+
+    def __init__(self, expiry):
+        self.expiry = expiry
+        self.calls = 0
+        self.during = None  # Action exécutée pendant la compilation
+
+    def __call__(self, now):
+        self.calls += 1
+        if self.during:
+            self.during()
+        return ("v%d" % self.calls, self.expiry)
+
+
+def test_compiled_value_is_reused_until_expiry():
+    compiler = Compiler(expiry=100)
+    value = CompiledValue(compiler)
+    assert value.get(10) == "v1"
+    assert value.get(99.9) == "v1"
+    assert compiler.calls == 1
+    assert value.get(100) == "v2"  # Échéance atteinte : exactement à la borne
+
+
+def test_invalidate_forces_recompilation():
+    compiler = Compiler(expiry=float("inf"))
+    value = CompiledValue(compiler)
+    value.get(0)
+    value.invalidate()
+    assert value.get(1) == "v2"
+    assert value.get(2) == "v2"
+
+
+def test_invalidation_during_compilation_is_not_lost():
+    compiler = Compiler(expiry=float("inf"))
+    value = CompiledValue(compiler)
+    compiler.during = value.invalidate
+    assert value.get(0) == "v1"
+    compiler.during = None
+    # Fichier arrivé pendant la compilation : le résultat n'est pas gardé jusqu'à l'échéance
+    assert value.get(1) == "v2"
+    assert value.get(2) == "v2"
@@ -0,0 +1,137 @@
+import time
+import threading
+
+import pytest
+
+from services import SingleFlight, BackgroundService
+
+
+def test_concurrent_callers_share_one_call():
+    flights = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def sync():
+        calls.append(None)
+        started.set()
+        release.wait(5)
+        return "résultat"
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flights.do("sync", sync)))
+    leader.start()
+    assert started.wait(5)
+    followers = [threading.Thread(target=lambda: results.append(flights.do("sync", sync))) for _ in range(3)]
+    for thread in followers:
+        thread.start()
+    time.sleep(0.2)  # Appelants suivants en attente de l'appel en cours
+    release.set()
+    for thread in [leader] + followers:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert results == ["résultat"] * 4
+
+
+def test_error_is_shared_and_next_call_runs_again():
+    flights = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    errors = []
+
+    def failing():
+        started.set()
+        release.wait(5)
+        raise IOError("coupure")
+
+    def call():
+        try:
+            flights.do("sync", failing)
+        except IOError as e:
+            errors.append(str(e))
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    assert started.wait(5)
+    follower = threading.Thread(target=call)
+    follower.start()
+    time.sleep(0.2)
+    release.set()
+    leader.join(5)
+    follower.join(5)
+    assert errors == ["coupure", "coupure"]
+
+    # Appel terminé : un nouvel appel relance l'opération
+    assert flights.do("sync", lambda: "ok") == "ok"
+    assert flights.calls == {}
+
+
+def test_different_keys_run_independently():
+    flights = SingleFlight()
+    inner = []
+
+    def outer():
+        # Clé différente : exécutée même pendant l'appel en cours
+        inner.append(flights.do(("download", "b.mp4"), lambda: "b"))
+        return "a"
+
+    assert flights.do(("download", "a.mp4"), outer) == "a"
+    assert inner == ["b"]
+
+
+def test_arguments_are_passed():
+    assert SingleFlight().do("k", lambda a, b: a + b, 1, 2) == 3
+    with pytest.raises(ValueError):
+        SingleFlight().do("k", int, "x")
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline
+        time.sleep(0.01)
+
+
+def test_request_returns_immediately_and_is_deduplicated():
+    release = threading.Event()
+    runs = []
+
+    def task():
+        runs.append(None)
+        release.wait(5)
+
+    service = BackgroundService("test", task, interval=3600)
+    service.start(immediate=False)
+    try:
+        started = time.time()
+        assert service.request()
+        assert time.time() - started < 0.5  # L'appelant n'attend pas la tâche
+        wait_for(lambda: service.busy)
+        assert service.active()
+        # Exécution en cours : nouvelle demande ignorée
+        assert not service.request()
+        release.set()
+        wait_for(lambda: not service.active())
+        assert runs == [None]
+        assert service.request()
+        wait_for(lambda: len(runs) == 2)
+    finally:
+        service.stop()
+
+
+def test_runs_periodically_and_survives_errors():
+    runs = []
+
+    def task():
+        runs.append(None)
+        raise IOError("réseau indisponible")
+
+    service = BackgroundService("test", task, interval=0.05)
+    service.start()
+    try:
+        wait_for(lambda: len(runs) >= 3)
+    finally:
+        service.stop()
+    service.thread.join(5)
+    assert not service.thread.is_alive()
@@ -0,0 +1,148 @@
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("requests")
+pytest.importorskip("cv2")
+
+from store import ContentStore, StorageManager
+
+
+@pytest.fixture
+def folder(tmp_path):
+    for name in ("store", "incoming"):
+        (tmp_path / name).mkdir()
+    return tmp_path
+
+
+def manager(folder, **options):
+    store = ContentStore(str(folder), lambda content, path: None, lambda: None)
+    return StorageManager(store, **options)
+
+
+def write(folder, name, size=100):
+    path = folder / name
+    path.write_bytes(b"x" * size)
+    return path
+
+
+def content(name, start=None, end=None):
+    return {"name": name,
+            "start_date": start.isoformat() if start else None,
+            "end_date": end.isoformat() if end else None}
+
+
+def remaining(folder):
+    return sorted(name for name in os.listdir(str(folder)) if os.path.isfile(str(folder / name)))
+
+
+def test_least_recently_played_evicted_first_until_under_quota(folder):
+    for name in ("a.jpg", "b.jpg", "c.jpg"):
+        write(folder, name)
+    storage = manager(folder, quota=150)
+    storage.played = {"a.jpg": 3.0, "b.jpg": 1.0, "c.jpg": 2.0}
+
+    assert storage.collect([]) == 2
+    assert remaining(folder) == ["a.jpg", "played.json"]
+    assert not storage.over_quota
+
+
+def test_current_and_upcoming_contents_are_protected(folder):
+    now = datetime.now()
+    names = ["current.jpg", "soon.jpg", "far.jpg", "expired.jpg", "removed.jpg"]
+    for name in names:
+        write(folder, name)
+    contents = [content("current.jpg"),
+                content("soon.jpg", start=now + timedelta(hours=2)),
+                content("far.jpg", start=now + timedelta(hours=48)),
+                content("expired.jpg", end=now - timedelta(hours=1))]
+    storage = manager(folder, quota=0, protect_hours=24)
+
+    assert storage.collect(contents) == 3
+    assert remaining(folder) == ["current.jpg", "played.json", "soon.jpg"]
+    # Toujours au-dessus du quota : les contenus lointains suivants sont reportés
+    assert storage.over_quota
+    assert storage.deferred(content("later.jpg", start=now + timedelta(hours=48)))
+    assert not storage.deferred(content("next.jpg", start=now + timedelta(hours=2)))
+
+
+def test_distant_contents_evicted_only_after_unused_ones(folder):
+    now = datetime.now()
+    write(folder, "far.jpg")
+    write(folder, "removed.jpg")
+    storage = manager(folder, quota=100)
+
+    assert storage.collect([content("far.jpg", start=now + timedelta(days=3))]) == 1
+    assert remaining(folder) == ["far.jpg", "played.json"]
+
+
+def test_renditions_and_partials_are_grouped_with_their_source(folder):
+    write(folder, "a.jpg")
+    write(folder, "a.jpg.1920x1080.rgb", 300)
+    write(folder / "incoming", "b.mp4.part", 200)
+    write(folder / "incoming", "b.mp4.part.json", 10)
+    storage = manager(folder)
+
+    units = storage.scan()
+    assert sorted(units[str(folder / "a.jpg")]["files"]) == [str(folder / "a.jpg"),
+                                                          str(folder / "a.jpg.1920x1080.rgb")]
+    assert units[str(folder / "a.jpg")]["size"] == 400
+    assert units[str(folder / "incoming" / "b.mp4")]["size"] == 210
+
+    # La diffusion d'une rendition compte pour son original
+    storage.mark_played(str(folder / "a.jpg.1920x1080.rgb"))
+    assert storage.scan()[str(folder / "a.jpg")]["played"] > 0
+
+
+def test_eviction_is_batched(folder):
+    for name in ("a.jpg", "b.jpg", "c.jpg"):
+        write(folder, name)
+    storage = manager(folder, quota=0, batch=1)
+    assert storage.collect([]) == 1
+    assert storage.collect([]) == 1
+    assert len(remaining(folder)) == 2  # Un fichier et played.json
+
+
+def test_evicted_blobs_are_removed_from_manifest(folder):
+    storage = manager(folder, quota=0)
+    blob = write(folder / "store", "0123abcd.jpg")
+    storage.store.record("a.jpg", "0123abcd", "http://h/a.jpg", {})
+    assert storage.store.path_for("a.jpg") == str(blob)
+
+    storage.collect([])
+    assert storage.store.entries == {}
+    assert storage.store.path_for("a.jpg") is None
+
+
+def test_tmp_files_count_and_stale_ones_are_removed(folder):
+    write(folder, "a.jpg")
+    fresh = write(folder, "manifest.json.tmp", 50)
+    stale = write(folder / "store", "0123abcd.jpg.1920x1080.rgb.tmp", 70)
+    os.utime(str(stale), (0, 0))
+    storage = manager(folder)
+
+    units = storage.scan()
+    assert sum(unit["size"] for unit in units.values()) == 220
+
+    # Sous le quota : seule l'écriture abandonnée est supprimée
+    assert storage.collect([]) == 1
+    assert not stale.exists()
+    assert fresh.exists()
+
+    # Au-delà du quota : une écriture en cours n'est jamais évincée
+    storage.quota = 0
+    storage.collect([])
+    assert fresh.exists()
+    assert not (folder / "a.jpg").exists()
+
+
+def test_orphan_renditions_are_removed(folder):
+    write(folder, "a.jpg.1920x1080.rgb")  # Original intégré au stockage
+    write(folder, "b.jpg")
+    kept = write(folder, "b.jpg.1920x1080.rgb")
+    storage = manager(folder)
+
+    assert storage.collect([content("a.jpg"), content("b.jpg")]) == 1
+    assert not (folder / "a.jpg.1920x1080.rgb").exists()
+    assert kept.exists()
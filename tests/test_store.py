@@ -0,0 +1,121 @@
+import os
+import time
+import hashlib
+
+import pytest
+
+pytest.importorskip("requests")
+
+from store import ContentStore
+
+
+def md5(data):
+    return hashlib.md5(data).hexdigest()
+
+
+@pytest.fixture
+def store(tmp_path):
+    for folder in ("store", "incoming"):
+        (tmp_path / folder).mkdir()
+    ready = []
+    changes = []
+    store = ContentStore(str(tmp_path), lambda content, path: ready.append((content["name"], path)),
+                         lambda: changes.append(None))
+    store.ready = ready
+    store.changes = changes
+    yield store
+    store.running = False
+
+
+def content(name, data=None, **extra):
+    item = {"name": name, "url": "http://h/" + name}
+    if data is not None:
+        item["md5"] = md5(data)
+    item.update(extra)
+    return item
+
+
+def receive(store, tmp_path, item, data, folder="incoming"):
+    """Fichier reçu confié à la vérification, attendue jusqu'à son terme"""
+    path = tmp_path / folder / item["name"]
+    path.write_bytes(data)
+    store.submit(item, str(path), {"etag": '"e1"'})
+    deadline = time.time() + 5
+    while store.status(item) == "pending":
+        assert time.time() < deadline
+        time.sleep(0.01)
+    return path
+
+
+def test_received_file_is_verified_in_background_and_stored_by_md5(store, tmp_path):
+    data = b"image" * 100
+    item = content("a.jpg", data)
+    assert store.status(item) == "fetch"
+    incoming = receive(store, tmp_path, item, data)
+
+    blob = os.path.join(str(tmp_path), "store", md5(data) + ".jpg")
+    assert store.ready == [("a.jpg", blob)]
+    assert store.path_for("a.jpg") == blob
+    assert not incoming.exists()
+    assert store.status(item) == "ok"
+    # Manifeste enregistré : relu au redémarrage
+    assert ContentStore(str(tmp_path), None, None).path_for("a.jpg") == blob
+
+
+def test_wrong_md5_is_rejected(store, tmp_path):
+    item = content("a.jpg", b"attendu")
+    incoming = receive(store, tmp_path, item, b"autre chose")
+    assert store.ready == []
+    assert not incoming.exists()
+    assert store.path_for("a.jpg") is None
+    assert store.status(item) == "fetch"
+
+
+def test_identical_content_under_another_name_is_not_downloaded(store, tmp_path):
+    data = b"video" * 100
+    receive(store, tmp_path, content("a.mp4", data), data)
+
+    twin = content("b.mp4", data)
+    assert store.status(twin) == "ok"  # Aucun téléchargement
+    assert store.path_for("b.mp4") == store.path_for("a.mp4")
+
+    # Reçu malgré tout sous un troisième nom : un seul exemplaire conservé
+    receive(store, tmp_path, content("c.mp4"), data)
+    assert os.listdir(str(tmp_path / "store")) == [md5(data) + ".mp4"]
+    assert store.path_for("c.mp4") == store.path_for("a.mp4")
+
+
+def test_changed_md5_triggers_download(store, tmp_path):
+    receive(store, tmp_path, content("a.jpg", b"v1"), b"v1")
+    assert store.status(content("a.jpg", b"v2")) == "fetch"
+
+
+def test_legacy_file_is_adopted(store, tmp_path):
+    data = b"ancien" * 100
+    legacy = tmp_path / "a.jpg"
+    legacy.write_bytes(data)
+    item = content("a.jpg", data)
+    assert store.status(item) == "adopt"
+    assert store.path_for("a.jpg") == str(legacy)  # Jouable pendant l'intégration
+
+    receive(store, tmp_path, item, data, folder=".")
+    assert not legacy.exists()
+    assert store.path_for("a.jpg") == os.path.join(str(tmp_path), "store", md5(data) + ".jpg")
+
+
+def test_without_md5_entry_is_revalidated_with_stored_validators(store, tmp_path):
+    item = content("a.jpg")
+    receive(store, tmp_path, item, b"data")
+    assert store.status(item) == "revalidate"
+    assert store.conditional_headers(item) == {"If-None-Match": '"e1"'}
+    # Empreinte fournie par le serveur : pas de requête conditionnelle
+    assert store.conditional_headers(content("a.jpg", b"data")) == {}
+
+
+def test_forget_missing_drops_deleted_blobs(store, tmp_path):
+    receive(store, tmp_path, content("a.jpg", b"data"), b"data")
+    os.remove(store.path_for("a.jpg"))
+    changes = len(store.changes)
+    store.forget_missing()
+    assert store.entries == {}
+    assert len(store.changes) == changes + 1
@@ -0,0 +1,113 @@
+from datetime import datetime
+
+import xibo_import
+from xibo_import import parse_xibo_date, read_cache_file, read_schedule, merge_windows
+
+CACHE_FILE = """<?xml version="1.0" encoding="utf-8"?>
+<xibo-image-render.js>
+    <md5>6152d3e99b2c61bb3db365d108337483</md5>
+    <valid>true</valid>
+</xibo-image-render.js>
+<26.jpg>
+    <md5>1D268B676438490D99581CC45807B532</md5>
+    <updated>1758738269</updated>
+    <valid>true</valid>
+</26.jpg>
+<27.mp4>
+    <md5>0123456789abcdef0123456789abcdef</md5>
+    <valid>false</valid>
+</27.mp4>
+"""
+
+LAYOUT = """<?xml version="1.0"?>
+<layout width="1920" height="1080">
+    <region id="1">
+        <media id="3" type="image" duration="15"><options><uri>26.jpg</uri></options></media>
+        <media id="4" type="video" duration="0"><options><uri>27.mp4</uri></options></media>
+    </region>
+</layout>
+"""
+
+
+def layout(file, fromdt, todt, priority, *files):
+    dependents = "".join("<file>%s</file>" % name for name in files)
+    return ('<layout file="%s" fromdt="%s" todt="%s" priority="%s"><dependents>%s</dependents></layout>'
+            % (file, fromdt, todt, priority, dependents))
+
+
+def write_schedule(tmp_path, *layouts, default=("1.png",)):
+    dependents = "".join("<file>%s</file>" % name for name in default)
+    (tmp_path / "schedule.xml").write_text(
+        '<?xml version="1.0" encoding="utf-8"?><schedule generated="2025-Sep-24 19:29:31">%s'
+        '<dependants><file>jquery.min.js</file></dependants>'
+        '<default file="4"><dependents>%s</dependents></default></schedule>' % ("".join(layouts), dependents))
+    return str(tmp_path / "schedule.xml")
+
+
+def by_name(catalog):
+    return {item["name"]: item for item in catalog}
+
+
+def test_parse_xibo_date():
+    assert parse_xibo_date("2025-Sep-24 20:00:00") == datetime(2025, 9, 24, 20)
+    assert parse_xibo_date("2025-sep-4 8:05:00") == datetime(2025, 9, 4, 8, 5)
+    assert parse_xibo_date("2025-Foo-24 20:00:00") is None
+    assert parse_xibo_date("2025-09-24 20:00:00") is None
+    assert parse_xibo_date(None) is None
+
+
+def test_cache_file_keeps_valid_entries_with_lowercase_md5(tmp_path):
+    path = tmp_path / "cacheFile.xml"
+    path.write_text(CACHE_FILE)
+    assert read_cache_file(str(path)) == {
+        "xibo-image-render.js": "6152d3e99b2c61bb3db365d108337483",
+        "26.jpg": "1d268b676438490d99581cc45807b532",
+    }
+
+
+def test_schedule_contents_priority_and_durations(tmp_path):
+    (tmp_path / "6.xlf").write_text(LAYOUT)
+    path = write_schedule(tmp_path,
+                          layout(6, "2025-Sep-24 20:00:00", "2025-Sep-25 00:00:00", 0, "26.jpg", "27.mp4", "8.html"),
+                          layout(7, "2025-Sep-24 21:00:00", "2025-Sep-24 22:00:00", 3, "28.png"))
+    catalog = by_name(read_schedule(path, str(tmp_path)))
+
+    assert sorted(catalog) == ["1.png", "26.jpg", "27.mp4", "28.png"]  # Fichiers techniques ignorés
+    assert catalog["26.jpg"] == {"name": "26.jpg", "type": "image", "duration": 15, "priority": 2,
+                                 "start_date": "2025-09-24T20:00:00", "end_date": "2025-09-25T00:00:00"}
+    assert catalog["27.mp4"]["type"] == "video"
+    assert catalog["27.mp4"]["duration"] == xibo_import.MEDIA_DURATION_DEFAULT  # Durée 0 : valeur par défaut
+    assert catalog["28.png"]["priority"] == 3  # Priorité Xibo bornée à 3
+
+
+def test_default_layout_is_unbounded(tmp_path):
+    path = write_schedule(tmp_path,
+                          layout(6, "2025-Sep-24 20:00:00", "2025-Sep-25 00:00:00", 1, "1.png"))
+    catalog = by_name(read_schedule(path))
+    assert "start_date" not in catalog["1.png"] and "end_date" not in catalog["1.png"]
+    assert catalog["1.png"]["priority"] == 3  # Priorité la plus haute des planifications
+
+
+def test_overlapping_windows_are_merged(tmp_path):
+    path = write_schedule(tmp_path,
+                          layout(6, "2025-Sep-24 20:00:00", "2025-Sep-25 00:00:00", 0, "26.jpg"),
+                          layout(7, "2025-Sep-24 22:00:00", "2025-Sep-25 02:00:00", 0, "26.jpg"),
+                          layout(8, "2025-Sep-25 02:00:00", "2025-Sep-25 03:00:00", 0, "26.jpg"))
+    item = by_name(read_schedule(path))["26.jpg"]
+    assert (item["start_date"], item["end_date"]) == ("2025-09-24T20:00:00", "2025-09-25T03:00:00")
+
+
+def test_disjoint_windows_are_not_imported(tmp_path, capsys):
+    path = write_schedule(tmp_path,
+                          layout(6, "2025-Sep-24 08:00:00", "2025-Sep-24 10:00:00", 0, "26.jpg"),
+                          layout(7, "2025-Sep-24 18:00:00", "2025-Sep-24 20:00:00", 0, "26.jpg"))
+    catalog = by_name(read_schedule(path))
+    assert "26.jpg" not in catalog  # Jamais diffusé entre 10 h et 18 h
+    assert "26.jpg" in capsys.readouterr().out
+
+
+def test_merge_windows_with_open_bounds():
+    a, b, c = datetime(2025, 1, 1), datetime(2025, 1, 2), datetime(2025, 1, 3)
+    assert merge_windows([(b, c), (None, a)]) == [(None, a), (b, c)]
+    assert merge_windows([(b, None), (a, b)]) == [(a, None)]
+    assert merge_windows([(a, c), (None, b)]) == [(None, c)]